@@ -1,34 +1,178 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne, UpdateMany, ReturnDocument
+from pymongo.errors import BulkWriteError
 import os
 import logging
 import aiohttp
 import asyncio
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Callable, Awaitable, Literal, NamedTuple
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import re
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse, urljoin
 import time
 import hashlib
+import math
 import random
+import codecs
+from html.parser import HTMLParser
+import ipaddress
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import hmac
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+import base64
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Write-behind buffer for analysis logs (batched, unordered insert_many)
+MONGO_WRITE_BATCH_SIZE = int(os.environ.get('MONGO_WRITE_BATCH_SIZE', '500'))
+MONGO_WRITE_FLUSH_INTERVAL = float(os.environ.get('MONGO_WRITE_FLUSH_INTERVAL', '1.0'))
+MONGO_WRITE_QUEUE_SIZE = int(os.environ.get('MONGO_WRITE_QUEUE_SIZE', '10000'))
+# Failed batch writes are retried this many times, waiting RETRY_DELAY, then twice as long each time
+MONGO_WRITE_RETRIES = int(os.environ.get('MONGO_WRITE_RETRIES', '3'))
+MONGO_WRITE_RETRY_DELAY = float(os.environ.get('MONGO_WRITE_RETRY_DELAY', '0.5'))
+
+# Pre-aggregated daily rollups for the analytics API
+ANALYTICS_ROLLUPS_ENABLED = os.environ.get('ANALYTICS_ROLLUPS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Records logged before base_domain/third_party_domains existed are backfilled at startup; tracker names come
+# from the analysis_results document stored for the same domain within this many seconds
+ANALYTICS_BACKFILL_MATCH_SECONDS = float(os.environ.get('ANALYTICS_BACKFILL_MATCH_SECONDS', '5'))
+ANALYTICS_BACKFILL_BATCH_SIZE = int(os.environ.get('ANALYTICS_BACKFILL_BATCH_SIZE', '500'))
+
+# Outbound HTTP client settings (shared connection pool for website analysis)
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', '100'))
+HTTP_POOL_PER_HOST = int(os.environ.get('HTTP_POOL_PER_HOST', '10'))
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get('HTTP_KEEPALIVE_TIMEOUT', '30'))
+HTTP_DNS_CACHE_TTL = int(os.environ.get('HTTP_DNS_CACHE_TTL', '300'))
+HTTP_FETCH_TIMEOUT = float(os.environ.get('HTTP_FETCH_TIMEOUT', '10'))
+
+# Streaming page fetch settings
+ANALYZE_MAX_BYTES = int(os.environ.get('ANALYZE_MAX_BYTES', str(5 * 1024 * 1024)))
+ANALYZE_CHUNK_SIZE = int(os.environ.get('ANALYZE_CHUNK_SIZE', str(64 * 1024)))
+
+# Budgets for crawling the scripts and iframes a page references
+CRAWL_MAX_RESOURCES = int(os.environ.get('CRAWL_MAX_RESOURCES', '20'))
+CRAWL_MAX_DEPTH = int(os.environ.get('CRAWL_MAX_DEPTH', '2'))
+CRAWL_MAX_BYTES = int(os.environ.get('CRAWL_MAX_BYTES', str(10 * 1024 * 1024)))
+CRAWL_MAX_RESOURCE_BYTES = int(os.environ.get('CRAWL_MAX_RESOURCE_BYTES', str(2 * 1024 * 1024)))
+CRAWL_CONCURRENCY = int(os.environ.get('CRAWL_CONCURRENCY', '6'))
+
+# Bodies larger than SCAN_OFFLOAD_BYTES are scanned in a process pool (0 workers keeps scanning in-process).
+# One core is left to the event loop, so single-core hosts scan in-process by default. Each worker
+# imports this module (about 75 MB resident), so the default is capped at two workers.
+SCAN_OFFLOAD_BYTES = int(os.environ.get('SCAN_OFFLOAD_BYTES', str(512 * 1024)))
+SCAN_PROCESS_WORKERS = int(os.environ.get('SCAN_PROCESS_WORKERS', str(min(2, max(0, (os.cpu_count() or 1) - 1)))))
+
+# Public Suffix List snapshot used to find registrable domains (e.g. bbc.co.uk)
+PUBLIC_SUFFIX_LIST_PATH = Path(os.environ.get('PUBLIC_SUFFIX_LIST_PATH', ROOT_DIR / 'data' / 'public_suffix_list.dat'))
+
+# Tracker lists (EasyList-style/hosts/plain domain .txt files and Disconnect services.json) and the
+# high-threat reputation list. Changed files are picked up every TRACKER_RELOAD_INTERVAL seconds
+# (0 disables polling; POST /api/admin/trackers/reload always works).
+TRACKER_LIST_DIR = Path(os.environ.get('TRACKER_LIST_DIR', ROOT_DIR / 'data' / 'trackers'))
+REPUTATION_LIST_PATH = Path(os.environ.get('REPUTATION_LIST_PATH', ROOT_DIR / 'data' / 'high_threat_domains.txt'))
+TRACKER_RELOAD_INTERVAL = float(os.environ.get('TRACKER_RELOAD_INTERVAL', '60'))
+
+# Known tracking cookie names, compiled into the cookie classifier at startup
+COOKIE_RULES_PATH = Path(os.environ.get('COOKIE_RULES_PATH', ROOT_DIR / 'data' / 'cookie_rules.txt'))
+
+# Analysis result cache settings
+ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', '1024'))
+ANALYSIS_CACHE_TTL = float(os.environ.get('ANALYSIS_CACHE_TTL', '300'))
+
+# Failing targets: no_live_data_available results are remembered per URL and options for
+# NEGATIVE_CACHE_TTL seconds, and a host whose fetches fail CIRCUIT_FAILURE_THRESHOLD times in a
+# row is not contacted for CIRCUIT_OPEN_SECONDS before a single trial fetch is let through
+NEGATIVE_CACHE_TTL = float(os.environ.get('NEGATIVE_CACHE_TTL', '30'))
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', '3'))
+CIRCUIT_OPEN_SECONDS = float(os.environ.get('CIRCUIT_OPEN_SECONDS', '60'))
+CIRCUIT_MAX_HOSTS = int(os.environ.get('CIRCUIT_MAX_HOSTS', '10000'))
+
+# Scan results memoized by content hash; SCAN_CACHE_BACKEND adds a 'disk' or 'mongo' tier
+SCAN_CACHE_SIZE = int(os.environ.get('SCAN_CACHE_SIZE', '4096'))
+SCAN_CACHE_BACKEND = os.environ.get('SCAN_CACHE_BACKEND', 'memory').lower()
+SCAN_CACHE_DIR = Path(os.environ.get('SCAN_CACHE_DIR', ROOT_DIR / 'data' / 'scan_cache'))
+
+# ETag/Last-Modified validators and findings remembered per URL for conditional re-fetches
+PAGE_VALIDATOR_CACHE_SIZE = int(os.environ.get('PAGE_VALIDATOR_CACHE_SIZE', '10000'))
+PAGE_VALIDATOR_TTL = float(os.environ.get('PAGE_VALIDATOR_TTL', str(7 * 24 * 3600)))
+
+# Batch analysis limits
+BATCH_MAX_URLS = int(os.environ.get('BATCH_MAX_URLS', '1000'))
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', '16'))
+BATCH_PER_HOST_CONCURRENCY = int(os.environ.get('BATCH_PER_HOST_CONCURRENCY', '2'))
+
+# Asynchronous analysis jobs
+ANALYSIS_JOB_WORKERS = int(os.environ.get('ANALYSIS_JOB_WORKERS', '4'))
+ANALYSIS_JOB_QUEUE_SIZE = int(os.environ.get('ANALYSIS_JOB_QUEUE_SIZE', '1000'))
+ANALYSIS_JOB_CALLBACK_TIMEOUT = float(os.environ.get('ANALYSIS_JOB_CALLBACK_TIMEOUT', '10'))
+# A running job whose lease is not renewed within this many seconds is taken over by another worker
+ANALYSIS_JOB_LEASE_SECONDS = float(os.environ.get('ANALYSIS_JOB_LEASE_SECONDS', '120'))
+
+# Watchlist rescans (disabled unless WATCHLIST_ENABLED is set)
+WATCHLIST_ENABLED = os.environ.get('WATCHLIST_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+WATCHLIST_INTERVAL = int(os.environ.get('WATCHLIST_INTERVAL', str(24 * 3600)))
+WATCHLIST_JITTER = float(os.environ.get('WATCHLIST_JITTER', '0.1'))
+WATCHLIST_CONCURRENCY = int(os.environ.get('WATCHLIST_CONCURRENCY', '8'))
+WATCHLIST_PER_HOST_CONCURRENCY = int(os.environ.get('WATCHLIST_PER_HOST_CONCURRENCY', '1'))
+WATCHLIST_HOST_DELAY = float(os.environ.get('WATCHLIST_HOST_DELAY', '5'))
+WATCHLIST_POLL_INTERVAL = float(os.environ.get('WATCHLIST_POLL_INTERVAL', '30'))
+
+# Bulk re-scoring of stored analyses
+RESCORE_BATCH_SIZE = int(os.environ.get('RESCORE_BATCH_SIZE', '100000'))
+
+# Emit per-request Server-Timing headers with pipeline stage durations
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Fast JSON encoding for hot responses
+def dump_json(content: Any) -> bytes:
+    """Encode content as compact UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=str)
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dump_json; routes return it directly to skip response_model re-validation"""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -40,11 +184,25 @@ class AnalysisOptions(BaseModel):
     includeWebScraping: bool = True  # Default to true for real-time analysis
     includeFingerprinting: bool = True
     includeEnvironmentalMetrics: bool = True
+    includeExternalScripts: bool = True  # Also fetch and scan referenced scripts and iframes
 
 class AnalysisRequest(BaseModel):
     url: str
     options: AnalysisOptions
 
+class AnalysisJobRequest(AnalysisRequest):
+    callbackUrl: Optional[str] = None
+
+class BatchAnalysisRequest(BaseModel):
+    urls: List[str]
+    options: AnalysisOptions = Field(default_factory=AnalysisOptions)
+    concurrency: Optional[int] = None
+
+class WatchlistEntryCreate(BaseModel):
+    url: str
+    intervalSeconds: int = Field(default=WATCHLIST_INTERVAL, ge=60)
+    options: AnalysisOptions = Field(default_factory=AnalysisOptions)
+
 class Cookie(BaseModel):
     name: str
     type: str
@@ -53,130 +211,2110 @@ class Cookie(BaseModel):
     expiry: str
     critique: Optional[str] = None
     isReal: bool = True
+    path: Optional[str] = None
+    secure: bool = False
+    httpOnly: bool = False
+    sameSite: Optional[str] = None
 
 class FingerprintingMethod(BaseModel):
     technique: str
     detected: bool
-    description: str
-    dataCollected: str
-    resistance: Optional[str] = None
+    description: str
+    dataCollected: str
+    resistance: Optional[str] = None
+
+class ThirdParty(BaseModel):
+    domain: str
+    category: str
+    purpose: str
+    requests: int
+    dataShared: str
+    critique: Optional[str] = None
+
+class EnvironmentalImpact(BaseModel):
+    carbonFootprint: str
+    dataTransfer: str
+    energyUsed: str
+    serverRequests: int
+    message: str
+    dataSaved: Optional[str] = None  # Bodies not re-downloaded thanks to 304 revalidation
+
+class CacheInfo(BaseModel):
+    hit: bool
+    ageSeconds: float
+    ttlSeconds: float
+
+class AnalysisResponse(BaseModel):
+    url: str
+    domain: str
+    threatLevel: str
+    threatDescription: str
+    trackingIndicators: List[str]
+    cookieCount: int
+    fingerprintingScore: int
+    analysisTimestamp: str
+    dataSource: str
+    isRealData: bool
+    poeticKeyword: str
+    cookies: List[Cookie]
+    fingerprinting: List[FingerprintingMethod]
+    thirdParties: List[ThirdParty]
+    environmentalImpact: EnvironmentalImpact
+    cache: Optional[CacheInfo] = None
+
+class ThreatThresholds(BaseModel):
+    """Cutoffs used by the threat scorer, both live and when re-scoring stored analyses"""
+    high: int = 16
+    medium: int = 10
+    personalMaxTracking: int = 5
+    personalMaxCookies: int = 3
+    personalMaxThirdParties: int = 2
+    personalMinIndicators: int = 3
+
+# Override with a JSON object, e.g. THREAT_THRESHOLDS='{"high": 20}'
+THREAT_THRESHOLDS = ThreatThresholds(**json.loads(os.environ.get('THREAT_THRESHOLDS', '{}')))
+
+class RescoreRequest(BaseModel):
+    thresholds: Optional[ThreatThresholds] = None  # Defaults to the live thresholds
+    collections: List[Literal['analysis_logs', 'analysis_results']] = Field(
+        default_factory=lambda: ['analysis_logs', 'analysis_results']
+    )
+    days: Optional[int] = Field(default=None, ge=1)
+    dryRun: bool = False
+    applyLive: bool = False  # Also switch new analyses to the thresholds (this process only)
+
+class PoisonRequest(BaseModel):
+    url: str
+    domain: str
+    poisonLevel: str = "aggressive"
+    targetCookies: List[str] = []
+
+class StatusCheck(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    client_name: str
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class StatusCheckCreate(BaseModel):
+    client_name: str
+
+class StatusCheckFields(BaseModel):
+    id: Optional[str] = None
+    client_name: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+class StatusCheckPage(BaseModel):
+    items: List[StatusCheckFields]
+    nextCursor: Optional[str] = None
+
+# Prometheus-style metrics
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name, self.documentation, self.labels = name, documentation, labels
+        self.type = 'counter'
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(label, '') for label in self.labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        super().__init__(name, documentation, labels)
+        self.type = 'gauge'
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[tuple(labels.get(label, '') for label in self.labels)] = value
+
+
+class Histogram:
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.documentation, self.labels = name, documentation, labels
+        self.type = 'histogram'
+        self.buckets = buckets
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(label, '') for label in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (bucket_counts, total, count) in self._series.items():
+            for bound, bucket_count in list(zip(self.buckets, bucket_counts)) + [('+Inf', count)]:
+                bucket_labels = _format_labels(self.labels, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {bucket_count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.register(Histogram(
+    'euridice_analysis_stage_seconds',
+    'Time spent per analysis pipeline stage (fetch includes dns and connect)',
+    ('stage',)
+))
+CACHE_LOOKUPS = metrics.register(Counter(
+    'euridice_analysis_cache_lookups_total', 'Analysis result cache lookups by outcome', ('result',)
+))
+SCAN_OFFLOADS = metrics.register(Counter(
+    'euridice_scan_offloads_total', 'Bodies scanned in the process pool by outcome', ('result',)
+))
+SCAN_CACHE_LOOKUPS = metrics.register(Counter(
+    'euridice_scan_cache_lookups_total', 'Content-hash scan cache lookups by tier that answered', ('result',)
+))
+FETCH_FAILURES = metrics.register(Counter(
+    'euridice_fetch_failures_total', 'Outbound page fetches that raised an error'
+))
+CIRCUIT_REJECTIONS = metrics.register(Counter(
+    'euridice_circuit_rejections_total', 'Analyses refused without a fetch because the host circuit was open'
+))
+NO_LIVE_DATA = metrics.register(Counter(
+    'euridice_no_live_data_total', 'Analyses that ended in a 422 no_live_data_available response'
+))
+ANALYSES_IN_FLIGHT = metrics.register(Gauge(
+    'euridice_analyses_in_flight', 'Live website analyses currently running'
+))
+WRITE_QUEUE_DEPTH = metrics.register(Gauge(
+    'euridice_mongo_write_queue_depth', 'Documents waiting in the MongoDB write-behind buffer'
+))
+WRITES_DROPPED = metrics.register(Counter(
+    'euridice_mongo_writes_dropped_total', 'Buffered documents and upserts given up on after their retries', ('collection',)
+))
+TRACKER_DOMAINS = metrics.register(Gauge(
+    'euridice_tracker_domains', 'Domains in the loaded tracker database'
+))
+
+# Stage durations of the current request, collected for the Server-Timing header
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('request_timings', default=None)
+
+
+def record_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed_stage(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def _tracing_config() -> aiohttp.TraceConfig:
+    """aiohttp hooks that time DNS resolution and connection setup"""
+    trace_config = aiohttp.TraceConfig()
+
+    async def start(session, context, params):
+        context.started = time.perf_counter()
+
+    def finish(stage: str):
+        async def hook(session, context, params):
+            record_stage(stage, time.perf_counter() - context.started)
+        return hook
+
+    trace_config.on_dns_resolvehost_start.append(start)
+    trace_config.on_dns_resolvehost_end.append(finish('dns'))
+    trace_config.on_connection_create_start.append(start)
+    trace_config.on_connection_create_end.append(finish('connect'))
+    return trace_config
+
+
+# Domain reputation
+def _hostname(domain: str) -> str:
+    """Lowercased hostname without port, userinfo or trailing dot"""
+    return (urlparse(f"//{domain}").hostname or domain).lower().rstrip('.')
+
+
+class PublicSuffixList:
+    """Public Suffix List rules for finding the registrable domain of a host.
+
+    Rules are kept in hash sets, so a lookup costs one probe per label.
+    """
+
+    def __init__(self, lines: Iterable[str] = ()):
+        self.rules = set()
+        self.wildcards = set()
+        self.exceptions = set()
+        for line in lines:
+            rule = line.strip().split(' ')[0]
+            if not rule or rule.startswith('//'):
+                continue
+            for form in self._forms(rule.lstrip('!*.')):
+                if rule.startswith('!'):
+                    self.exceptions.add(form)
+                elif rule.startswith('*.'):
+                    self.wildcards.add(form)
+                else:
+                    self.rules.add(form)
+
+    @classmethod
+    def load(cls, path: Path) -> 'PublicSuffixList':
+        try:
+            with open(path, encoding='utf-8') as handle:
+                return cls(handle)
+        except OSError as e:
+            logger.warning(f"Public Suffix List unavailable ({e}); falling back to last-two-labels domains")
+            return cls()
+
+    @staticmethod
+    def _forms(rule: str) -> List[str]:
+        # Hosts from URLs arrive in punycode, so index internationalized rules in both forms
+        forms = [rule.lower()]
+        try:
+            encoded = rule.encode('idna').decode('ascii')
+            if encoded != forms[0]:
+                forms.append(encoded)
+        except UnicodeError:
+            pass
+        return forms
+
+    def public_suffix_length(self, labels: List[str]) -> int:
+        """Number of trailing labels that form the public suffix (longest matching rule wins)"""
+        count = len(labels)
+        for start in range(count):
+            candidate = '.'.join(labels[start:])
+            if candidate in self.exceptions:
+                return count - start - 1
+            if candidate in self.rules:
+                return count - start
+            if start + 1 < count and '.'.join(labels[start + 1:]) in self.wildcards:
+                return count - start
+        # Implicit "*" rule: unlisted TLDs are public suffixes
+        return 1
+
+    def top_level_domains(self) -> frozenset:
+        """Last labels of every rule, i.e. the known top-level domains"""
+        return frozenset(rule.rsplit('.', 1)[-1] for rule in self.rules | self.wildcards | self.exceptions)
+
+    def registrable_domain(self, host: str) -> str:
+        """eTLD+1 for a host, e.g. "news.bbc.co.uk" -> "bbc.co.uk" """
+        labels = host.lower().strip('.').split('.')
+        if len(labels) < 2 or _is_ip_address(host):
+            return host.lower()
+        suffix_length = self.public_suffix_length(labels)
+        if suffix_length >= len(labels):
+            return host.lower()
+        return '.'.join(labels[-(suffix_length + 1):])
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class DomainReputationIndex:
+    """Hash index of flagged domains, matched against every label suffix of a host.
+
+    A lookup for "m.facebook.com" probes "m.facebook.com" then "facebook.com",
+    so cost is O(labels) regardless of how many domains are listed.
+    """
+
+    def __init__(self, domains: Iterable[str]):
+        self.domains = frozenset(domain.strip().lower().rstrip('.') for domain in domains if domain.strip())
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+    def lookup(self, host: str) -> Optional[str]:
+        """Most specific listed domain that host belongs to, or None"""
+        labels = host.lower().rstrip('.').split('.')
+        for start in range(len(labels)):
+            candidate = '.'.join(labels[start:])
+            if candidate in self.domains:
+                return candidate
+        return None
+
+
+# Tracker and reputation lists
+DOMAIN_LIST_HOSTS_ADDRESSES = ('0.0.0.0', '127.0.0.1', '::', '::1')
+DOMAIN_LIST_METADATA = re.compile(r'[!#]\s*(type|category)\s*:\s*(.+)', re.IGNORECASE)
+DOMAIN_NAME_PATTERN = re.compile(r'[a-z0-9_-]+(?:\.[a-z0-9_-]+)*\.[a-z][a-z0-9-]*')
+DEFAULT_TRACKER_PROFILE = ('tracking', 'data collection')
+# Disconnect services.json categories as (type, category)
+DISCONNECT_CATEGORIES = {
+    'Advertising': ('advertising surveillance', 'attention economy'),
+    'Analytics': ('behavioral tracking', 'surveillance capitalism'),
+    'Social': ('advertising surveillance', 'social surveillance'),
+    'Content': ('embedded content', 'data collection'),
+    'FingerprintingInvasive': ('device fingerprinting', 'covert identification'),
+    'FingerprintingGeneral': ('device fingerprinting', 'covert identification'),
+    'Cryptomining': ('cryptomining', 'resource extraction'),
+    'Email': ('email tracking', 'inbox surveillance'),
+    'EmailAggressive': ('email tracking', 'inbox surveillance'),
+    'Disconnect': ('cross-site tracking', 'attention economy'),
+}
+
+
+def parse_domain_list(lines: Iterable[str]) -> Iterable[tuple]:
+    """Yield (domain, (type, category)) from EasyList domain rules, hosts entries or bare domains.
+
+    "! Type: ..." and "! Category: ..." comments set the profile of the
+    rules after them. Rules with paths, wildcards or exceptions are skipped.
+    """
+    profile = DEFAULT_TRACKER_PROFILE
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        metadata = DOMAIN_LIST_METADATA.match(line)
+        if metadata:
+            value = metadata.group(2).strip()
+            profile = (value, profile[1]) if metadata.group(1).lower() == 'type' else (profile[0], value)
+            continue
+        if line[0] in '!#[':
+            continue
+        if line.startswith('||'):
+            rule = line[2:].partition('$')[0]
+            domain = rule[:-1] if rule.endswith('^') else rule
+        else:
+            fields = line.split()
+            domain = fields[1] if len(fields) > 1 and fields[0] in DOMAIN_LIST_HOSTS_ADDRESSES else fields[0]
+        domain = domain.lower().rstrip('.')
+        if DOMAIN_NAME_PATTERN.fullmatch(domain):
+            yield domain, profile
+
+
+def parse_disconnect_services(services: Dict[str, Any]) -> Iterable[tuple]:
+    """Yield (domain, (type, category)) from a Disconnect services.json document"""
+    for category, entries in services.get('categories', {}).items():
+        profile = DISCONNECT_CATEGORIES.get(category, DEFAULT_TRACKER_PROFILE)
+        for entry in entries:
+            for organisation in entry.values():
+                for domains in organisation.values():
+                    # Besides homepage -> domains, entries carry flags such as "performance": "true"
+                    if isinstance(domains, list):
+                        for domain in domains:
+                            yield domain.lower().rstrip('.'), profile
+
+
+class TrackerDatabase:
+    """Tracker and reputation lists compiled into label-suffix hash indexes.
+
+    A database is never modified after it is built: reloading builds a new
+    one and swaps the analyzer's reference, so analyses already running keep
+    the lists they started with. Each (type, category) profile is stored
+    once as a ready-made finding row, so a list costs one dict entry per domain.
+    """
+
+    def __init__(self, trackers: Iterable[tuple] = (), reputation: Iterable[str] = (), sources: tuple = ()):
+        rows: Dict[tuple, tuple] = {}
+        self.trackers: Dict[str, tuple] = {}
+        for domain, (tracker_type, category) in trackers:
+            profile = (tracker_type, category)
+            row = rows.get(profile)
+            if row is None:
+                row = rows[profile] = (
+                    category,
+                    f"Detected {tracker_type} scripts and trackers",
+                    f"Commodifies human attention and agency for {category}"
+                )
+            self.trackers[domain] = row
+        self.reputation = DomainReputationIndex(reputation)
+        self.sources = sources
+        self.loaded_at = datetime.utcnow()
+
+    @staticmethod
+    def list_sources(tracker_dir: Path, reputation_path: Path) -> tuple:
+        """(path, mtime_ns, size) of every list file, in load order; any change means a reload is due"""
+        try:
+            paths = sorted(path for path in tracker_dir.iterdir() if path.suffix in ('.txt', '.json'))
+        except OSError:
+            paths = []
+        sources = []
+        for path in paths + [reputation_path]:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            sources.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(sources)
+
+    @classmethod
+    def load(cls, tracker_dir: Path, reputation_path: Path) -> 'TrackerDatabase':
+        sources = cls.list_sources(tracker_dir, reputation_path)
+        lists = [Path(path) for path, _, _ in sources if Path(path) != reputation_path]
+        if not lists:
+            logger.warning(f"No tracker lists found in {tracker_dir}; third parties will not be detected")
+        try:
+            with open(reputation_path, encoding='utf-8') as handle:
+                reputation = [domain for domain, _ in parse_domain_list(handle)]
+        except OSError as e:
+            logger.warning(f"Reputation list unavailable ({e}); no domain will be flagged as high-threat")
+            reputation = []
+        return cls(cls._read_lists(lists), reputation, sources)
+
+    @staticmethod
+    def _read_lists(paths: List[Path]) -> Iterable[tuple]:
+        # Later files override earlier ones for the same domain
+        for path in paths:
+            try:
+                with open(path, encoding='utf-8') as handle:
+                    if path.suffix == '.json':
+                        yield from parse_disconnect_services(json.load(handle))
+                    else:
+                        yield from parse_domain_list(handle)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping tracker list {path}: {e}")
+
+    def lookup(self, host: str) -> Optional[str]:
+        """Most specific listed tracker domain that host (lowercase) belongs to, or None"""
+        candidate = host
+        while candidate not in self.trackers:
+            dot = candidate.find('.')
+            if dot < 0:
+                return None
+            candidate = candidate[dot + 1:]
+        return candidate
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "trackers": len(self.trackers),
+            "reputationDomains": len(self.reputation),
+            "sources": [path for path, _, _ in self.sources],
+            "loadedAt": self.loaded_at.isoformat()
+        }
+
+
+class TrackerDatabaseReloader:
+    """Rebuilds the analyzer's TrackerDatabase when the list files change.
+
+    Lists are parsed in a worker thread so analyses keep running during a
+    reload, and the finished database is swapped in with one assignment.
+    Cached analyses were scored against the old lists, so the analysis
+    cache is cleared after every swap.
+    """
+
+    def __init__(self, analyzer: 'PrivacyAnalyzer', tracker_dir: Path, reputation_path: Path, interval: float):
+        self.analyzer = analyzer
+        self.tracker_dir = tracker_dir
+        self.reputation_path = reputation_path
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def reload(self, force: bool = True) -> Dict[str, Any]:
+        """Rebuild the database (only if a list file changed, unless forced) and report what is loaded"""
+        async with self._lock:
+            current = self.analyzer.trackers
+            if not force:
+                sources = await asyncio.to_thread(TrackerDatabase.list_sources, self.tracker_dir, self.reputation_path)
+                if sources == current.sources:
+                    return {**current.stats(), "reloaded": False}
+            started = time.perf_counter()
+            database = await asyncio.to_thread(TrackerDatabase.load, self.tracker_dir, self.reputation_path)
+            self.analyzer.trackers = database
+            analysis_cache.clear()
+            TRACKER_DOMAINS.set(len(database.trackers))
+            seconds = time.perf_counter() - started
+            logger.info(f"Loaded {len(database.trackers)} tracker domains and {len(database.reputation)} "
+                        f"reputation domains in {seconds:.2f}s")
+            return {**database.stats(), "reloaded": True, "seconds": round(seconds, 3)}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reload(force=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Tracker list reload failed: {e}")
+
+
+# Multi-pattern matching
+class PatternMatcher:
+    """Finds many literal patterns in one pass with a compiled regex.
+
+    Built once from the fingerprinting keywords; the regex engine does the
+    scanning in C, so cost tracks the text length. The alternation sits in a
+    lookahead, so it is tried at every position and overlapping hits (the
+    "webrtc" and "canvas" in "webrtcanvas") are all reported, as are patterns
+    that are prefixes of a longer hit. Matching is case-insensitive: patterns
+    are lowercased at build time and callers feed lowercased text.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(dict.fromkeys(pattern.lower() for pattern in patterns if pattern))
+        # Identifies the pattern set, so cached scan results are never reused across different lists
+        self.signature = hashlib.sha256('\n'.join(self.patterns).encode('utf-8')).hexdigest()[:16]
+        # The lookahead reports the longest pattern at each position; shorter ones it starts with are implied
+        self._hits = {
+            pattern: [(index, len(prefix)) for index, prefix in enumerate(self.patterns) if pattern.startswith(prefix)]
+            for pattern in self.patterns
+        }
+        ordered = sorted(self.patterns, key=len, reverse=True)
+        self._regex = re.compile('(?=(%s))' % '|'.join(re.escape(pattern) for pattern in ordered)) if ordered else None
+        # A hit can straddle a chunk boundary by at most this many characters
+        self._overlap = max((len(pattern) for pattern in self.patterns), default=1) - 1
+
+    def scan(self, text: str, tail: str, counts: Dict[int, int]) -> str:
+        """Add the pattern hits in lowercased text to counts.
+
+        tail is what the previous call on the same region returned ('' at its
+        start), so hits split across chunks are found exactly once. Returns the
+        tail to pass along with the next chunk.
+        """
+        if self._regex is None:
+            return ''
+        window = tail + text
+        boundary = len(tail)
+        hits = self._hits
+        for match in self._regex.finditer(window):
+            start = match.start()
+            for index, length in hits[match.group(1)]:
+                # Hits that end inside the tail were counted with the previous chunk
+                if start + length > boundary:
+                    counts[index] = counts.get(index, 0) + 1
+        return window[-self._overlap:] if self._overlap else ''
+
+
+# Streaming HTML tokenization
+# Attribute holding the URL for each tag whose URL is checked against tracker domains
+URL_ATTRIBUTES = {'script': 'src', 'iframe': 'src', 'img': 'src', 'link': 'href'}
+# Script types that carry data or markup rather than code
+NON_SCRIPT_TYPES = ('application/ld+json', 'application/json', 'importmap', 'speculationrules',
+                    'text/template', 'text/html', 'text/x-template')
+
+def _is_pixel(attributes: Dict[str, Optional[str]]) -> bool:
+    """Tracking pixels are images sized 0-1px or hidden with inline styles"""
+    tiny = {'0', '1', '0px', '1px'}
+    if (attributes.get('width') or '').strip() in tiny and (attributes.get('height') or '').strip() in tiny:
+        return True
+    style = (attributes.get('style') or '').replace(' ', '').lower()
+    return 'display:none' in style or 'visibility:hidden' in style or ('width:1px' in style and 'height:1px' in style)
+
+
+class PageTokenizer(HTMLParser):
+    """Streaming HTML tokenizer that only passes on the regions trackers live in.
+
+    Inline script bodies and the URLs of scripts, iframes, images and links
+    are handed to on_text (with fresh=True at the start of each region).
+    Script and iframe URLs also go to on_resource. Pixel-style images go to
+    on_pixel. Prose, CSS and comments are skipped.
+    """
+
+    def __init__(self, on_text: Callable[[str, bool], None], on_resource: Callable[[str], None], on_pixel: Callable[[str], None]):
+        super().__init__(convert_charrefs=False)
+        self._on_text = on_text
+        self._on_resource = on_resource
+        self._on_pixel = on_pixel
+        self._in_script = False
+        self._fresh_script = False
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]):
+        attributes = dict(attrs)
+        if tag == 'script':
+            self._in_script = (attributes.get('type') or '').strip().lower() not in NON_SCRIPT_TYPES
+            self._fresh_script = True
+        attribute = URL_ATTRIBUTES.get(tag)
+        url = (attributes.get(attribute) or '').strip() if attribute else ''
+        if not url or url.startswith('data:'):
+            return
+        self._on_text(url, True)
+        if tag in ('script', 'iframe'):
+            self._on_resource(url)
+        elif tag == 'img' and _is_pixel(attributes):
+            self._on_pixel(url)
+
+    def handle_endtag(self, tag: str):
+        if tag == 'script':
+            self._in_script = False
+
+    def handle_data(self, data: str):
+        if self._in_script:
+            self._on_text(data, self._fresh_script)
+            self._fresh_script = False
+
+
+# Dotted host tokens anywhere in scripts and tag URLs ("//cdn.example.com", "api_host:'api.example.com'",
+# "'.example.com/ga.js'") are looked up in the tracker database after the scan
+HOST_REFERENCE_PATTERN = re.compile(r'(?<![a-z0-9_.-])\.?([a-z0-9_-]+(?:\.[a-z0-9_-]+)+)')
+# Longest text one reference can span: a leading dot and a 253-character hostname
+HOST_REFERENCE_SPAN = 254
+# Registrable-domain rules, shared by the analyzer and (through their last labels) the scanner
+PUBLIC_SUFFIXES = PublicSuffixList.load(PUBLIC_SUFFIX_LIST_PATH)
+# Only tokens ending in a known top-level domain are kept, so JavaScript member chains such as
+# "document.body" don't fill hosts; without a suffix list every token is kept
+TOP_LEVEL_DOMAINS = PUBLIC_SUFFIXES.top_level_domains() or None
+
+
+# Streaming page scanning
+class PageScanner:
+    """Incrementally scans a page body with a shared PatternMatcher.
+
+    Raw chunks are decoded with an incremental decoder. HTML documents go
+    through a PageTokenizer so only inline scripts and tag URLs reach the
+    matcher; scripts and other bodies (html=False) are matched in full. The
+    matcher's tail is carried across chunks within a region, so patterns
+    split across chunk boundaries are still found exactly once. The same
+    regions are searched for dotted host tokens, counted in hosts. With
+    collect_resources, script and iframe URLs are recorded for the crawl stage.
+    """
+
+    def __init__(self, matcher: PatternMatcher, encoding: Optional[str] = None, collect_resources: bool = False, html: bool = True):
+        self.matcher = matcher
+        self.counts: Dict[int, int] = {}
+        self.hosts: Dict[str, int] = {}
+        self.resources: List[str] = []
+        self.pixels: List[str] = []
+        self.bytes_scanned = 0
+        self.chars_matched = 0
+        self.decode_seconds = 0.0
+        self.scan_seconds = 0.0
+        try:
+            decoder_factory = codecs.getincrementaldecoder(encoding or 'utf-8')
+        except LookupError:
+            decoder_factory = codecs.getincrementaldecoder('utf-8')
+        self._decoder = decoder_factory(errors='replace')
+        self._tail = ''
+        self._host_tail = ''
+        self._host_start = 0
+        self._collect_resources = collect_resources
+        self._tokenizer = PageTokenizer(self._match, self._add_resource, self.pixels.append) if html else None
+
+    @property
+    def matches(self) -> Dict[str, int]:
+        """Occurrence counts keyed by pattern, in first-seen order"""
+        patterns = self.matcher.patterns
+        return {patterns[index]: count for index, count in self.counts.items()}
+
+    def feed(self, chunk: bytes):
+        self.bytes_scanned += len(chunk)
+        self._scan(self._decode(chunk))
+
+    def close(self):
+        self._scan(self._decode(b'', final=True))
+        started = time.perf_counter()
+        if self._tokenizer is not None:
+            self._tokenizer.close()
+        self._count_hosts(self._host_tail, final=True)
+        self.scan_seconds += time.perf_counter() - started
+
+    def _decode(self, chunk: bytes, final: bool = False) -> str:
+        started = time.perf_counter()
+        text = self._decoder.decode(chunk, final)
+        self.decode_seconds += time.perf_counter() - started
+        return text
+
+    def _scan(self, text: str):
+        if text:
+            started = time.perf_counter()
+            if self._tokenizer is not None:
+                self._tokenizer.feed(text)
+            else:
+                self._match(text, False)
+            self.scan_seconds += time.perf_counter() - started
+
+    def _match(self, text: str, fresh: bool):
+        if fresh:
+            self._count_hosts(self._host_tail, final=True)
+            self._tail = ''
+        lowered = text.lower()
+        self.chars_matched += len(text)
+        self._tail = self.matcher.scan(lowered, self._tail, self.counts)
+        self._count_hosts(self._host_tail + lowered, final=False)
+
+    def _count_hosts(self, text: str, final: bool):
+        # A reference starting near the end may continue in the region's next chunk, so it waits for it
+        limit = len(text) if final else len(text) - HOST_REFERENCE_SPAN
+        hosts = self.hosts
+        top_level_domains = TOP_LEVEL_DOMAINS
+        for match in HOST_REFERENCE_PATTERN.finditer(text, self._host_start):
+            if match.start() >= limit:
+                break
+            host = match.group(1)
+            if top_level_domains is None or host[host.rfind('.') + 1:] in top_level_domains:
+                hosts[host] = hosts.get(host, 0) + 1
+        if final:
+            self._host_tail = ''
+            self._host_start = 0
+        else:
+            # One character before the unscanned text is kept so the lookbehind never starts a token mid-word
+            resume = max(limit, self._host_start)
+            context = max(0, resume - 1)
+            self._host_tail = text[context:]
+            self._host_start = resume - context
+
+    def _add_resource(self, url: str):
+        if self._collect_resources and url not in self.resources:
+            self.resources.append(url)
+
+
+def scan_body(scanner: PageScanner, body: bytes) -> Dict[str, Any]:
+    """Feed a complete body through the scanner and return its compact findings"""
+    for offset in range(0, len(body), ANALYZE_CHUNK_SIZE):
+        scanner.feed(body[offset:offset + ANALYZE_CHUNK_SIZE])
+    scanner.close()
+    return scan_summary(scanner)
+
+
+def scan_summary(scanner: PageScanner) -> Dict[str, Any]:
+    return {
+        "matches": scanner.matches,
+        "hosts": scanner.hosts,
+        "resources": scanner.resources,
+        "pixels": scanner.pixels,
+        "decode_seconds": scanner.decode_seconds,
+        "scan_seconds": scanner.scan_seconds
+    }
+
+
+# Scanning large bodies in worker processes
+_worker_matcher: Optional[PatternMatcher] = None
+
+def _init_scan_worker(patterns: List[str]):
+    """Build the detector matcher once per worker process"""
+    global _worker_matcher
+    _worker_matcher = PatternMatcher(patterns)
+
+def _scan_worker_ready() -> bool:
+    return _worker_matcher is not None
+
+def _scan_in_worker(body: bytes, encoding: Optional[str], collect_resources: bool, html: bool) -> Dict[str, Any]:
+    return scan_body(PageScanner(_worker_matcher, encoding, collect_resources, html), body)
+
+
+class ScanOffloader:
+    """Runs scans of large bodies in a ProcessPoolExecutor so they don't stall the event loop.
+
+    Bodies go to the workers as raw bytes and only the findings dict comes back.
+    If the pool is disabled, scans run in-process; a broken pool is replaced
+    and the failed scan is retried in-process.
+    """
+
+    def __init__(self, workers: int, threshold: int):
+        self.workers = workers
+        self.threshold = threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._patterns: List[str] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self._executor is not None
+
+    def start(self, matcher: PatternMatcher):
+        if self.workers <= 0 or self._executor is not None:
+            return
+        self._patterns = matcher.patterns
+        self._executor = self._new_executor()
+        # Start the workers now rather than on the first large page
+        for _ in range(self.workers):
+            self._executor.submit(_scan_worker_ready)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn avoids forking a process that already runs the event loop and database threads
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_scan_worker,
+            initargs=(self._patterns,)
+        )
+
+    async def stop(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+    def should_offload(self, size: int) -> bool:
+        return self._executor is not None and size > self.threshold
+
+    async def scan(self, matcher: PatternMatcher, body: bytes, encoding: Optional[str], collect_resources: bool, html: bool) -> Dict[str, Any]:
+        if self.should_offload(len(body)):
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, _scan_in_worker, body, encoding, collect_resources, html
+                )
+                SCAN_OFFLOADS.inc(result='ok')
+                return result
+            except BrokenProcessPool as e:
+                SCAN_OFFLOADS.inc(result='fallback')
+                logger.error(f"Scan process pool failed, restarting it and scanning in-process: {e}")
+                broken, self._executor = self._executor, self._new_executor()
+                broken.shutdown(wait=False, cancel_futures=True)
+        return scan_body(PageScanner(matcher, encoding, collect_resources, html), body)
+
+
+# Content-addressed scan result cache
+# Part of every key; bump it when the scanner's findings change meaning, so persisted results are not reused
+SCAN_RESULT_VERSION = 2
+
+class ScanResultCache:
+    """Scan results keyed by the SHA-256 of the scanned bytes and the matcher signature.
+
+    Popular tracker bundles are byte-identical across sites, so their pattern
+    hits are computed once. The in-process LRU can be backed by a 'disk'
+    (one JSON file per digest) or 'mongo' (scan_results collection) tier that
+    survives restarts.
+    """
+
+    def __init__(self, max_entries: int, backend: str = 'memory', directory: Optional[Path] = None):
+        self.backend = backend
+        self.directory = directory
+        self._memory = TTLCache(max_entries, float('inf'))
+
+    @staticmethod
+    def key(matcher: PatternMatcher, content: bytes) -> str:
+        return f"{matcher.signature}-{SCAN_RESULT_VERSION}-{hashlib.sha256(content).hexdigest()}"
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        cached = self._memory.get(key)
+        return cached[0] if cached is not None else None
+
+    def set_local(self, key: str, result: Dict[str, Any]):
+        self._memory.set(key, result)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        result = self.get_local(key)
+        if result is not None:
+            SCAN_CACHE_LOOKUPS.inc(result='memory')
+            return result
+        try:
+            if self.backend == 'disk':
+                result = await asyncio.to_thread(self._read_file, key)
+            elif self.backend == 'mongo':
+                document = await db.scan_results.find_one({"_id": key})
+                result = self._from_document(document) if document else None
+        except Exception as e:
+            logger.warning(f"Scan cache {self.backend} lookup failed: {e}")
+            result = None
+        if result is None:
+            SCAN_CACHE_LOOKUPS.inc(result='miss')
+            return None
+        SCAN_CACHE_LOOKUPS.inc(result=self.backend)
+        self.set_local(key, result)
+        return result
+
+    async def set(self, key: str, result: Dict[str, Any]):
+        self.set_local(key, result)
+        try:
+            if self.backend == 'disk':
+                await asyncio.to_thread(self._write_file, key, result)
+            elif self.backend == 'mongo':
+                await mongo_writer.enqueue_update(
+                    'scan_results', {"_id": key},
+                    {"$set": {**self._to_document(result), "storedAt": datetime.utcnow()}}
+                )
+        except Exception as e:
+            logger.warning(f"Scan cache {self.backend} store failed: {e}")
+
+    def clear(self) -> int:
+        return self._memory.clear()
+
+    # Host keys such as 'www.google-analytics.com' contain dots, which MongoDB
+    # rejects in field names, so counts are stored as [key, count] pairs
+    @staticmethod
+    def _to_document(result: Dict[str, Any]) -> Dict[str, Any]:
+        return {"matches": [[pattern, count] for pattern, count in result["matches"].items()],
+                "hosts": [[host, count] for host, count in result["hosts"].items()],
+                "resources": result.get("resources", []),
+                "pixels": result.get("pixels", [])}
+
+    @staticmethod
+    def _from_document(document: Dict[str, Any]) -> Dict[str, Any]:
+        return {"matches": {pattern: count for pattern, count in document["matches"]},
+                "hosts": {host: count for host, count in document.get("hosts", [])},
+                "resources": list(document.get("resources", [])),
+                "pixels": list(document.get("pixels", []))}
+
+    def _read_file(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.directory / f"{key}.json"
+        if not path.exists():
+            return None
+        return self._from_document(json.loads(path.read_text()))
+
+    def _write_file(self, key: str, result: Dict[str, Any]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{key}.json"
+        staging = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+        staging.write_text(json.dumps(self._to_document(result)))
+        os.replace(staging, path)
+
+
+# Analysis result cache
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for cache keys: lowercased scheme/host, no default port or fragment"""
+    parsed = urlparse(url.strip())
+    try:
+        port = parsed.port
+    except ValueError:
+        return url.strip()
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f"[{host}]"
+    if port is not None and (scheme, port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{port}"
+    if parsed.username is not None:
+        userinfo = parsed.username if parsed.password is None else f"{parsed.username}:{parsed.password}"
+        host = f"{userinfo}@{host}"
+    return urlunparse((scheme, host, parsed.path or '/', parsed.params, parsed.query, ''))
+
+
+def analysis_cache_key(url: str, options: AnalysisOptions) -> tuple:
+    return (normalize_url(url), tuple(sorted(options.dict().items())))
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire a fixed number of seconds after being stored"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> Optional[tuple]:
+        """Return (value, age_seconds) for a live entry, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        age = time.monotonic() - stored_at
+        if age >= self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value, age
+
+    def set(self, key, value):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, predicate) -> int:
+        """Drop every entry whose key satisfies predicate, returning how many were removed"""
+        stale = [key for key in self._entries if predicate(key)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> int:
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+
+# In-flight request coalescing
+class SingleFlight:
+    """Runs at most one task per key; concurrent callers for that key await the same task.
+
+    The shared task is shielded, so a cancelled caller stops waiting without
+    cancelling the work other callers depend on. Exceptions reach every caller.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Any, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def run(self, key, factory: Callable[[], Awaitable]):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda finished: self._finished(key, finished))
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the outcome as retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+# Per-host politeness
+class HostLimiter:
+    """Caps how many operations run against one host at a time.
+
+    Semaphores are created on first use and dropped once a host goes idle,
+    so memory tracks the hosts currently being contacted.
+    """
+
+    def __init__(self, per_host: int):
+        self.per_host = max(1, per_host)
+        self._slots: Dict[str, list] = {}
+
+    @asynccontextmanager
+    async def limit(self, host: str):
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = [asyncio.Semaphore(self.per_host), 0]
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                yield
+        finally:
+            slot[1] -= 1
+            if not slot[1]:
+                del self._slots[host]
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker for page fetches.
+
+    A host's circuit opens after `threshold` consecutive failures and fetches
+    are refused for `open_seconds`. After that a single trial fetch is let
+    through (half-open): success closes the circuit, failure reopens it. A
+    trial that never reports back stops blocking others after `trial_timeout`.
+    Only failing hosts are tracked, in a bounded LRU dict.
+    """
+
+    def __init__(self, threshold: int, open_seconds: float, trial_timeout: float, max_hosts: int):
+        self.threshold = max(1, threshold)
+        self.open_seconds = open_seconds
+        self.trial_timeout = trial_timeout
+        self.max_hosts = max_hosts
+        # host -> [consecutive failures, opened at, trial started at]
+        self._hosts: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+    def check(self, host: str) -> Optional[float]:
+        """None if host may be fetched now, otherwise the seconds until it may"""
+        state = self._hosts.get(host)
+        if state is None or state[0] < self.threshold:
+            return None
+        now = time.monotonic()
+        remaining = state[1] + self.open_seconds - now
+        if remaining > 0:
+            return remaining
+        if state[2] is not None and now - state[2] < self.trial_timeout:
+            return state[2] + self.trial_timeout - now
+        state[2] = now
+        return None
+
+    def record_success(self, host: str):
+        self._hosts.pop(host, None)
+
+    def record_failure(self, host: str):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = [0, 0.0, None]
+        self._hosts.move_to_end(host)
+        state[0] += 1
+        if state[0] >= self.threshold:
+            state[1] = time.monotonic()
+            state[2] = None
+        while len(self._hosts) > self.max_hosts:
+            self._hosts.popitem(last=False)
+
+
+# Buffered MongoDB persistence
+class MongoWriteBuffer:
+    """Write-behind buffer that batches documents into unordered insert_many calls.
+
+    Documents are flushed per collection when a batch fills up or the flush
+    interval passes; queued upserts go out in the same flush via bulk_write.
+    The queue is bounded: when MongoDB falls behind, enqueue() waits for
+    room, which pushes back on producers instead of growing memory. Writes
+    that fail are retried with exponential backoff; only the operations that
+    failed go again, so $inc upserts that were applied are not repeated.
+    What still fails after the retries is logged and counted as dropped.
+    Until start() is called (scripts, benchmarks) documents are written
+    directly.
+    """
+
+    def __init__(self, database, batch_size: int, flush_interval: float, max_queued: int,
+                 retries: int = MONGO_WRITE_RETRIES, retry_delay: float = MONGO_WRITE_RETRY_DELAY):
+        self.database = database
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.retries = max(0, retries)
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything queued so far and stop the background writer"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        await self._queue.put(None)
+        await task
+
+    async def enqueue(self, collection: str, document: Dict[str, Any]):
+        if self._task is None:
+            await self.database[collection].insert_one(document)
+            return
+        await self._queue.put((collection, document))
+
+    async def enqueue_update(self, collection: str, filter: Dict[str, Any], update: Dict[str, Any]):
+        """Queue an upsert, e.g. an incremental $inc on a rollup document"""
+        if self._task is None:
+            await self.database[collection].update_one(filter, update, upsert=True)
+            return
+        await self._queue.put((collection, UpdateOne(filter, update, upsert=True)))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[tuple]):
+        documents_by_collection: Dict[str, List[Dict[str, Any]]] = {}
+        updates_by_collection: Dict[str, List[UpdateOne]] = {}
+        for collection, item in batch:
+            if isinstance(item, UpdateOne):
+                updates_by_collection.setdefault(collection, []).append(item)
+            else:
+                documents_by_collection.setdefault(collection, []).append(item)
+        for collection, documents in documents_by_collection.items():
+            await self._write(collection, documents, updates=False)
+        for collection, updates in updates_by_collection.items():
+            await self._write(collection, updates, updates=True)
+
+    async def _write(self, collection: str, items: List[Any], updates: bool):
+        error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+            try:
+                with timed_stage('mongo_write'):
+                    if updates:
+                        await self.database[collection].bulk_write(items, ordered=False)
+                    else:
+                        await self.database[collection].insert_many(items, ordered=False)
+                return
+            except BulkWriteError as e:
+                # A duplicate key means the document was written by an earlier attempt
+                failed = {failure["index"] for failure in e.details.get("writeErrors", []) if failure.get("code") != 11000}
+                items = [item for index, item in enumerate(items) if index in failed]
+                if not items:
+                    return
+                error = e
+            except Exception as e:
+                error = e
+            logger.warning(f"Buffered write of {len(items)} operations to {collection} failed (attempt {attempt + 1}): {error}")
+        logger.error(f"Dropped {len(items)} buffered writes to {collection} after {self.retries + 1} attempts: {error}")
+        WRITES_DROPPED.inc(len(items), collection=collection)
+
+
+mongo_writer = MongoWriteBuffer(db, MONGO_WRITE_BATCH_SIZE, MONGO_WRITE_FLUSH_INTERVAL, MONGO_WRITE_QUEUE_SIZE)
+
+
+async def record_analysis_rollups(analysis_record: Dict[str, Any]):
+    """Fold one analysis_logs record into the per-day domain and tracker rollups"""
+    if not ANALYTICS_ROLLUPS_ENABLED:
+        return
+    day = analysis_record["timestamp"].replace(hour=0, minute=0, second=0, microsecond=0)
+    day_key = day.strftime('%Y-%m-%d')
+    await mongo_writer.enqueue_update(
+        'analysis_daily_rollups',
+        {"_id": f"{day_key}:{analysis_record['base_domain']}"},
+        {
+            "$setOnInsert": {"day": day, "domain": analysis_record["base_domain"]},
+            "$inc": {
+                "total": 1,
+                f"threat_levels.{analysis_record['threat_level']}": 1,
+                "cookies_found": analysis_record["cookies_found"],
+                "third_parties": analysis_record["third_parties"]
+            }
+        }
+    )
+    for tracker in analysis_record["third_party_domains"]:
+        await mongo_writer.enqueue_update(
+            'tracker_daily_rollups',
+            {"_id": f"{day_key}:{tracker}"},
+            {"$setOnInsert": {"day": day, "tracker": tracker}, "$inc": {"count": 1}}
+        )
+
+
+# Background analysis jobs
+class AnalysisJobQueue:
+    """Analysis jobs persisted in MongoDB and run by a bounded pool of asyncio workers.
+
+    Jobs are stored before their id is returned, so queued or interrupted
+    jobs are picked up again on the next start. A worker claims a job
+    atomically and renews a lease on it while it runs; jobs whose lease ran
+    out (their worker or instance died) are claimed again. Submissions are
+    refused once max_queued jobs are waiting.
+    """
+
+    def __init__(self, collection_name: str, workers: int, max_queued: int, run: Callable[[str, AnalysisOptions], Awaitable], lease_seconds: float = ANALYSIS_JOB_LEASE_SECONDS):
+        self.collection_name = collection_name
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.run = run
+        self.lease_seconds = lease_seconds
+        # Identifies this instance's claims, so a worker never overwrites a job another one took over
+        self.owner = str(uuid.uuid4())
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def collection(self):
+        return db[self.collection_name]
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._resume()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request: AnalysisJobRequest) -> Dict[str, Any]:
+        if self._queue is None:
+            raise HTTPException(status_code=503, detail="Analysis job workers are not running")
+        if self._queue.qsize() >= self.max_queued:
+            raise HTTPException(status_code=503, detail="Analysis job queue is full - try again later",
+                                headers={"Retry-After": "30"})
+        job = {
+            "_id": str(uuid.uuid4()),
+            "status": "queued",
+            "url": request.url,
+            "options": request.options.dict(),
+            "callbackUrl": request.callbackUrl,
+            "createdAt": datetime.utcnow()
+        }
+        await self.collection.insert_one(job)
+        self._queue.put_nowait(job["_id"])
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": job_id})
+
+    @staticmethod
+    def _expired(now: datetime) -> Dict[str, Any]:
+        """Filter for running jobs whose lease has run out (or that predate leases)"""
+        return {"status": "running", "leaseUntil": {"$not": {"$gt": now}}}
+
+    async def _resume(self):
+        """Queue the unfinished jobs now, then keep looking for ones whose worker stopped renewing its lease"""
+        query = {"$or": [{"status": "queued"}, self._expired(datetime.utcnow())]}
+        while True:
+            try:
+                unfinished = await self.collection.find(query, {"_id": 1}).sort("createdAt", 1).to_list(None)
+            except Exception as e:
+                logger.warning(f"Could not resume analysis jobs: {e}")
+                unfinished = []
+            # Ids may also sit in another instance's queue; only one claim succeeds
+            for job in unfinished:
+                self._queue.put_nowait(job["_id"])
+            if unfinished:
+                logger.info(f"Resumed {len(unfinished)} analysis jobs")
+            await asyncio.sleep(self.lease_seconds)
+            # Queued jobs submitted here are already in the queue; later passes only look for lapsed leases
+            query = self._expired(datetime.utcnow())
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Analysis job {job_id} crashed: {e}")
+
+    async def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Mark the job running under this instance's lease, or return None if someone else holds it"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"_id": job_id, "$or": [{"status": "queued"}, self._expired(now)]},
+            {"$set": {
+                "status": "running",
+                "owner": self.owner,
+                "startedAt": now,
+                "leaseUntil": now + timedelta(seconds=self.lease_seconds)
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _renew_lease(self, job_id: str, running: asyncio.Future) -> bool:
+        """Extend the job's lease until cancelled; returns True after cancelling the run if the lease was lost"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                result = await self.collection.update_one(
+                    {"_id": job_id, "owner": self.owner, "status": "running"},
+                    {"$set": {"leaseUntil": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+                )
+            except Exception as e:
+                # The lease still has time left; try again on the next beat
+                logger.warning(f"Could not renew the lease on analysis job {job_id}: {e}")
+                continue
+            if not result.matched_count:
+                logger.warning(f"Analysis job {job_id} was taken over by another worker; abandoning this run")
+                running.cancel()
+                return True
+
+    async def _run_job(self, job_id: str):
+        job = await self._claim(job_id)
+        if job is None:
+            return
+
+        update: Dict[str, Any] = {}
+        running = asyncio.ensure_future(self.run(job["url"], AnalysisOptions(**job["options"])))
+        heartbeat = asyncio.create_task(self._renew_lease(job_id, running))
+        try:
+            result = await running
+            update.update(status="succeeded", statusCode=200, result=result)
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled() and heartbeat.result():
+                return
+            raise
+        except HTTPException as e:
+            update.update(status="failed", statusCode=e.status_code, error=e.detail)
+        except Exception as e:
+            logger.error(f"Analysis job {job_id} failed for {job['url']}: {e}")
+            update.update(status="failed", statusCode=500, error="Analysis failed")
+        finally:
+            heartbeat.cancel()
+        update["finishedAt"] = datetime.utcnow()
+
+        if job.get("callbackUrl"):
+            update["callbackStatus"] = await self._deliver_callback(job["callbackUrl"], {**job, **update})
+        # Skipped if the lease lapsed and another worker took the job over
+        await self.collection.update_one({"_id": job_id, "owner": self.owner}, {"$set": update})
+
+    async def _deliver_callback(self, callback_url: str, job: Dict[str, Any]) -> str:
+        try:
+            session = await privacy_analyzer._get_session()
+            payload = json.loads(json.dumps(_public_job(job), default=str))
+            async with session.post(callback_url, json=payload,
+                                    timeout=aiohttp.ClientTimeout(total=ANALYSIS_JOB_CALLBACK_TIMEOUT)) as response:
+                return f"delivered ({response.status})"
+        except Exception as e:
+            logger.warning(f"Callback to {callback_url} failed: {e}")
+            return f"failed ({type(e).__name__})"
+
+
+def _public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    public = {key: value for key, value in job.items() if key not in ("_id", "owner", "leaseUntil")}
+    return {"id": job["_id"], **public}
+
+
+class WatchlistScheduler:
+    """Re-analyzes the URLs stored in the watchlist collection on their own schedules.
+
+    New entries get a random first run within their interval and every later
+    run is jittered, so thousands of nightly rescans spread out instead of
+    arriving together. Runs are bounded globally and per host, and only what
+    changed since the previous scan is written to analysis_logs.
+    """
+
+    def __init__(self, collection_name: str, concurrency: int, per_host: int, host_delay: float, poll_interval: float, jitter: float):
+        self.collection_name = collection_name
+        self.concurrency = max(1, concurrency)
+        self.host_delay = host_delay
+        self.poll_interval = poll_interval
+        self.jitter = jitter
+        self._hosts = HostLimiter(per_host)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        return db[self.collection_name]
+
+    def start(self):
+        if self._task is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def add(self, entry: WatchlistEntryCreate) -> Dict[str, Any]:
+        key = normalize_url(entry.url)
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": key},
+            {
+                "$set": {"url": entry.url, "intervalSeconds": entry.intervalSeconds, "options": entry.options.dict()},
+                "$setOnInsert": {
+                    "createdAt": now,
+                    "nextRunAt": now + timedelta(seconds=random.uniform(0, entry.intervalSeconds))
+                }
+            },
+            upsert=True
+        )
+        return await self.collection.find_one({"_id": key})
+
+    async def remove(self, url: str) -> bool:
+        result = await self.collection.delete_one({"_id": normalize_url(url)})
+        return result.deleted_count > 0
+
+    async def _run(self):
+        while True:
+            try:
+                ran = await self.run_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Watchlist scheduler pass failed: {e}")
+                ran = 0
+            if not ran:
+                await asyncio.sleep(self.poll_interval)
+
+    async def run_due(self) -> int:
+        """Rescan the entries whose nextRunAt has passed, returning how many ran"""
+        now = datetime.utcnow()
+        due = await self.collection.find({"nextRunAt": {"$lte": now}}).sort("nextRunAt", 1).to_list(self.concurrency * 4)
+        claimed = []
+        for entry in due:
+            # Push nextRunAt out first so a second instance polling the same collection skips the entry
+            lease = now + timedelta(seconds=entry["intervalSeconds"])
+            result = await self.collection.update_one(
+                {"_id": entry["_id"], "nextRunAt": entry["nextRunAt"]}, {"$set": {"nextRunAt": lease}}
+            )
+            if result.modified_count:
+                claimed.append(entry)
+        await asyncio.gather(*(self._rescan(entry) for entry in claimed))
+        return len(claimed)
+
+    async def _rescan(self, entry: Dict[str, Any]):
+        host = urlparse(entry["url"]).netloc.lower()
+        async with self._hosts.limit(host):
+            async with self._semaphore:
+                await self._rescan_entry(entry)
+            # Holding the host slot a little longer spaces out requests to the same site
+            await asyncio.sleep(self.host_delay)
+
+    async def _rescan_entry(self, entry: Dict[str, Any]):
+        update: Dict[str, Any] = {"lastRunAt": datetime.utcnow()}
+        try:
+            result = await privacy_analyzer.analyze_website(entry["url"], AnalysisOptions(**entry.get("options", {})), log=False)
+            snapshot = self._snapshot(result)
+            diff = self._diff(entry.get("lastSnapshot"), snapshot)
+            if diff:
+                await mongo_writer.enqueue('analysis_logs', {
+                    "record_type": "rescan_diff",
+                    "url": entry["url"],
+                    "domain": result.domain,
+                    "base_domain": privacy_analyzer.public_suffixes.registrable_domain(_hostname(result.domain)),
+                    "timestamp": update["lastRunAt"],
+                    **diff
+                })
+            update.update(lastStatus="ok", lastSnapshot=snapshot)
+        except HTTPException as e:
+            update["lastStatus"] = f"failed ({e.status_code})"
+        except Exception as e:
+            logger.warning(f"Watchlist rescan of {entry['url']} failed: {e}")
+            update["lastStatus"] = "failed"
+        interval = entry["intervalSeconds"] * (1 + random.uniform(-self.jitter, self.jitter))
+        update["nextRunAt"] = datetime.utcnow() + timedelta(seconds=interval)
+        await self.collection.update_one({"_id": entry["_id"]}, {"$set": update})
+
+    @staticmethod
+    def _snapshot(result: AnalysisResponse) -> Dict[str, Any]:
+        return {
+            "threat_level": result.threatLevel,
+            "cookies": sorted({cookie.name for cookie in result.cookies}),
+            "third_parties": sorted({party.domain for party in result.thirdParties}),
+            "fingerprinting": sorted(method.technique for method in result.fingerprinting if method.detected)
+        }
+
+    @staticmethod
+    def _diff(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Changes between two snapshots, or None when nothing changed (the first scan diffs against nothing)"""
+        previous = previous or {"threat_level": None, "cookies": [], "third_parties": [], "fingerprinting": []}
+        diff: Dict[str, Any] = {"threat_level": current["threat_level"], "previous_threat_level": previous["threat_level"]}
+        changed = current["threat_level"] != previous["threat_level"]
+        for field in ("cookies", "third_parties", "fingerprinting"):
+            before, after = set(previous[field]), set(current[field])
+            diff[f"new_{field}"] = sorted(after - before)
+            diff[f"removed_{field}"] = sorted(before - after)
+            changed = changed or before != after
+        return diff if changed else None
+
+
+# Tracking Analysis Functions
+# A site whose domain or trackers mention these is never treated as a personal site
+PLATFORM_DOMAIN_KEYWORDS = ('google', 'facebook', 'amazon', 'microsoft')
+PLATFORM_TRACKER_DOMAINS = ('google-analytics', 'facebook-pixel', 'google-tag-manager')
+
+def describe_threat(level: str, total_tracking: int, personal: bool, platform_domain: Optional[str] = None) -> str:
+    """Threat description shown with a level, shared by live scoring and bulk re-scoring"""
+    if personal:
+        return f"Personal/minimal tracking website with {total_tracking} mechanisms"
+    if platform_domain is not None:
+        return f"Known surveillance platform ({platform_domain}) with extensive tracking infrastructure"
+    if level == "HIGH":
+        return f"Surveillance-heavy domain with {total_tracking} tracking mechanisms"
+    if level == "MEDIUM":
+        return f"Moderate tracking with {total_tracking} mechanisms detected"
+    return f"Minimal tracking with {total_tracking} mechanisms detected"
+
+# Cookie categories used by the rule table: (type, purpose template, critique)
+COOKIE_CATEGORIES = {
+    'analytics': (
+        'behavioral tracking',
+        '{vendor} - constructs behavioral profiles across digital spaces',
+        'Creates persistent identity markers for surveillance capitalism'
+    ),
+    'advertising': (
+        'advertising surveillance',
+        '{vendor} tracking - builds psychographic profiles for manipulation',
+        'Enables cross-platform behavioral modification and social control'
+    ),
+    'cross-site': (
+        'cross-site tracking',
+        '{vendor} - omnipresent user identification',
+        'Creates persistent shadow profiles across the web'
+    ),
+    'session-replay': (
+        'session recording',
+        '{vendor} - replays every click, scroll and keystroke',
+        'Turns ordinary browsing into reviewable surveillance footage'
+    ),
+}
+
+
+class SetCookie(NamedTuple):
+    """A Set-Cookie header parsed per RFC 6265 section 5.2"""
+    name: str
+    value: str
+    domain: Optional[str]
+    path: Optional[str]
+    expires: Optional[datetime]
+    max_age: Optional[int]
+    secure: bool
+    http_only: bool
+    same_site: Optional[str]
+
+    def lifetime(self, now: datetime) -> Optional[float]:
+        """Seconds until expiry (Max-Age wins over Expires), or None for session cookies"""
+        if self.max_age is not None:
+            return float(self.max_age)
+        if self.expires is not None:
+            return (self.expires - now).total_seconds()
+        return None
+
+
+# Servers almost always send the IMF-fixdate (or RFC 850) form, which gets a single-regex fast path
+COOKIE_DATE_COMMON = re.compile(r'[A-Za-z]{3,9}, (\d{2})[ -]([A-Za-z]{3})[ -](\d{2,4}) (\d{2}):(\d{2}):(\d{2}) GMT')
+COOKIE_DATE_DELIMITERS = re.compile(r'[\x09\x20-\x2f\x3b-\x40\x5b-\x60\x7b-\x7e]+')
+COOKIE_DATE_TIME = re.compile(r'(\d{1,2}):(\d{1,2}):(\d{1,2})(?:\D|$)')
+COOKIE_DATE_DAY = re.compile(r'(\d{1,2})(?:\D|$)')
+COOKIE_DATE_YEAR = re.compile(r'(\d{2,4})(?:\D|$)')
+COOKIE_DATE_MONTHS = {month: index for index, month in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)}
+COOKIE_MAX_AGE = re.compile(r'-?\d+')
+COOKIE_SAME_SITE_VALUES = {'strict': 'Strict', 'lax': 'Lax', 'none': 'None'}
+
+
+def parse_cookie_date(value: str) -> Optional[datetime]:
+    """Parse an Expires value with the RFC 6265 section 5.1.1 algorithm (naive UTC)"""
+    common = COOKIE_DATE_COMMON.fullmatch(value)
+    if common is not None and common.group(2).lower() in COOKIE_DATE_MONTHS:
+        day, month, year, hour, minute, second = common.groups()
+        return _cookie_datetime(int(year), COOKIE_DATE_MONTHS[month.lower()], int(day), (int(hour), int(minute), int(second)))
+    hms = day = month = year = None
+    for token in COOKIE_DATE_DELIMITERS.split(value):
+        if not token:
+            continue
+        if hms is None:
+            match = COOKIE_DATE_TIME.match(token)
+            if match:
+                hms = tuple(int(group) for group in match.groups())
+                continue
+        if day is None:
+            match = COOKIE_DATE_DAY.match(token)
+            if match:
+                day = int(match.group(1))
+                continue
+        if month is None and token[:3].lower() in COOKIE_DATE_MONTHS:
+            month = COOKIE_DATE_MONTHS[token[:3].lower()]
+            continue
+        if year is None:
+            match = COOKIE_DATE_YEAR.match(token)
+            if match:
+                year = int(match.group(1))
+    if hms is None or day is None or month is None or year is None:
+        return None
+    return _cookie_datetime(year, month, day, hms)
+
+
+def _cookie_datetime(year: int, month: int, day: int, hms: tuple) -> Optional[datetime]:
+    if 70 <= year <= 99:
+        year += 1900
+    elif 0 <= year <= 69:
+        year += 2000
+    if not 1 <= day <= 31 or year < 1601 or hms[0] > 23 or hms[1] > 59 or hms[2] > 59:
+        return None
+    try:
+        return datetime(year, month, day, *hms)
+    except ValueError:
+        return None
+
+
+def parse_set_cookie(header: str) -> Optional[SetCookie]:
+    """Parse one Set-Cookie header value, or None when RFC 6265 says to ignore it"""
+    name_value, _, attributes = header.partition(';')
+    name, separator, value = name_value.partition('=')
+    name = name.strip()
+    if not separator or not name:
+        return None
+    domain = path = expires = max_age = same_site = None
+    secure = http_only = False
+    # Later attributes override earlier ones, as in the RFC's cookie-attribute-list
+    for attribute in attributes.split(';') if attributes else ():
+        key, _, attribute_value = attribute.partition('=')
+        key = key.strip().lower()
+        attribute_value = attribute_value.strip()
+        if key == 'expires':
+            parsed = parse_cookie_date(attribute_value)
+            if parsed is not None:
+                expires = parsed
+        elif key == 'max-age':
+            if COOKIE_MAX_AGE.fullmatch(attribute_value):
+                max_age = int(attribute_value)
+        elif key == 'domain':
+            if attribute_value:
+                domain = attribute_value.lstrip('.').lower()
+        elif key == 'path':
+            path = attribute_value if attribute_value.startswith('/') else None
+        elif key == 'secure':
+            secure = True
+        elif key == 'httponly':
+            http_only = True
+        elif key == 'samesite':
+            same_site = COOKIE_SAME_SITE_VALUES.get(attribute_value.lower(), same_site)
+    return SetCookie(name, value.strip(), domain, path, expires, max_age, secure, http_only, same_site)
+
+
+def describe_cookie_lifetime(seconds: Optional[float]) -> str:
+    """Human-readable cookie lifetime, e.g. "2 years" or "Session" """
+    if seconds is None:
+        return 'Session'
+    if seconds <= 0:
+        return 'Expired'
+    for unit, size in (('year', 365 * 86400), ('day', 86400), ('hour', 3600), ('minute', 60)):
+        if seconds >= size:
+            count = int(seconds // size)
+            return f"{count} {unit}{'s' if count != 1 else ''}"
+    return f"{int(seconds)} seconds"
+
+
+class CookieRuleTable:
+    """Tracking cookie classifier compiled from a rule file.
+
+    Exact names are a dict lookup; prefix rules and substring rules are each
+    compiled into one alternation regex (longest first), so classifying a
+    cookie costs at most three lookups however many rules are loaded.
+    """
+
+    def __init__(self, lines: Iterable[str] = ()):
+        self.exact: Dict[str, tuple] = {}
+        self.prefixes: Dict[str, tuple] = {}
+        self.substrings: Dict[str, tuple] = {}
+        for line in lines:
+            fields = line.split(None, 2)
+            if len(fields) < 3 or fields[0].startswith('#'):
+                continue
+            pattern, category, vendor = fields[0].lower(), fields[1], fields[2].strip()
+            if category not in COOKIE_CATEGORIES:
+                logger.warning(f"Skipping cookie rule {pattern}: unknown category {category}")
+                continue
+            cookie_type, purpose, critique = COOKIE_CATEGORIES[category]
+            classification = (cookie_type, purpose.format(vendor=vendor), critique)
+            if pattern.startswith('*') and pattern.endswith('*'):
+                self.substrings.setdefault(pattern.strip('*'), classification)
+            elif pattern.endswith('*'):
+                self.prefixes.setdefault(pattern.rstrip('*'), classification)
+            else:
+                self.exact.setdefault(pattern, classification)
+        self._prefix_pattern = self._compile(self.prefixes)
+        self._substring_pattern = self._compile(self.substrings)
+
+    @classmethod
+    def load(cls, path: Path) -> 'CookieRuleTable':
+        try:
+            with open(path, encoding='utf-8') as handle:
+                return cls(handle)
+        except OSError as e:
+            logger.warning(f"Cookie rules unavailable ({e}); every cookie will be unclassified")
+            return cls()
+
+    @staticmethod
+    def _compile(patterns: Dict[str, tuple]) -> Optional[re.Pattern]:
+        if not patterns:
+            return None
+        return re.compile('|'.join(re.escape(pattern) for pattern in sorted(patterns, key=len, reverse=True)))
+
+    def __len__(self) -> int:
+        return len(self.exact) + len(self.prefixes) + len(self.substrings)
+
+    def classify(self, name: str) -> Optional[tuple]:
+        """(type, purpose, critique) for a cookie name, or None if no rule matches"""
+        lowered = name.lower()
+        classification = self.exact.get(lowered)
+        if classification is not None:
+            return classification
+        if self._prefix_pattern is not None:
+            match = self._prefix_pattern.match(lowered)
+            if match:
+                return self.prefixes[match.group()]
+        if self._substring_pattern is not None:
+            match = self._substring_pattern.search(lowered)
+            if match:
+                return self.substrings[match.group()]
+        return None
+
+
+# Substrings that mark tracking indicators in the threat summary
+PIXEL_COOKIE_MARKERS = ('pixel', 'track', 'analytics', 'gtm', 'fbp', '_ga', '_gid')
+PIXEL_COOKIE_PATTERN = re.compile('|'.join(re.escape(marker) for marker in PIXEL_COOKIE_MARKERS))
+ADVANCED_FINGERPRINTING_MARKERS = ('canvas', 'webgl', 'audio', 'battery', 'webrtc')
+MAJOR_TRACKER_KEYWORDS = ('google', 'facebook', 'amazon', 'microsoft', 'adobe')
+
+# Detector findings travel through the pipeline as compact records; the
+# Pydantic response models are only built once, for the response itself
+class CookieFinding(NamedTuple):
+    name: str
+    type: str
+    purpose: str
+    critique: Optional[str]
+    domain: str
+    expiry: str
+    is_pixel: bool
+    path: Optional[str] = None
+    secure: bool = False
+    http_only: bool = False
+    same_site: Optional[str] = None
+
+class FingerprintCheck(NamedTuple):
+    """One row of the precomputed fingerprinting table, with the response model for either outcome"""
+    pattern: str
+    technique: str
+    is_advanced: bool
+    model: FingerprintingMethod
+    detected_model: FingerprintingMethod
+
+class FingerprintFinding(NamedTuple):
+    check: FingerprintCheck
+    detected: bool
 
-class ThirdParty(BaseModel):
+class ThirdPartyFinding(NamedTuple):
     domain: str
     category: str
     purpose: str
+    critique: str
     requests: int
-    dataShared: str
-    critique: Optional[str] = None
-
-class EnvironmentalImpact(BaseModel):
-    carbonFootprint: str
-    dataTransfer: str
-    energyUsed: str
-    serverRequests: int
-    message: str
-
-class AnalysisResponse(BaseModel):
-    url: str
-    domain: str
-    threatLevel: str
-    threatDescription: str
-    trackingIndicators: List[str]
-    cookieCount: int
-    fingerprintingScore: int
-    analysisTimestamp: str
-    dataSource: str
-    isRealData: bool
-    poeticKeyword: str
-    cookies: List[Cookie]
-    fingerprinting: List[FingerprintingMethod]
-    thirdParties: List[ThirdParty]
-    environmentalImpact: EnvironmentalImpact
-
-class PoisonRequest(BaseModel):
-    url: str
-    domain: str
-    poisonLevel: str = "aggressive"
-    targetCookies: List[str] = []
+    is_major: bool
+    is_platform: bool
 
-class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+# Returned (as a 422) when an analysis could not observe the site itself
+NO_LIVE_DATA_DETAIL = {
+    "error": "no_live_data_available",
+    "message": "Unable to collect live data from this website. This may be due to website restrictions, security measures, or network issues. Please try again with a different URL or check your connection.",
+    "suggestions": [
+        "Try a different website (e.g., facebook.com, twitter.com, amazon.com)",
+        "Ensure the URL is accessible and not blocked",
+        "Check your internet connection",
+        "Some websites may block automated analysis"
+    ]
+}
 
-class StatusCheckCreate(BaseModel):
-    client_name: str
+def _retry_after(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
 
-# Tracking Analysis Functions
 class PrivacyAnalyzer:
     def __init__(self):
-        self.known_trackers = {
-            'google-analytics.com': {'type': 'behavioral tracking', 'category': 'surveillance capitalism'},
-            'googletagmanager.com': {'type': 'tag management', 'category': 'data collection'},
-            'facebook.com': {'type': 'advertising surveillance', 'category': 'social surveillance'},
-            'doubleclick.net': {'type': 'cross-site tracking', 'category': 'attention economy'},
-            'hotjar.com': {'type': 'behavioral monitoring', 'category': 'intimate surveillance'},
-            'mixpanel.com': {'type': 'event tracking', 'category': 'behavioral analysis'},
-            'amplitude.com': {'type': 'user analytics', 'category': 'behavioral profiling'}
-        }
+        # Tracker and reputation lists; replaced as a whole by TrackerDatabaseReloader
+        self.trackers = TrackerDatabase.load(TRACKER_LIST_DIR, REPUTATION_LIST_PATH)
+        TRACKER_DOMAINS.set(len(self.trackers.trackers))
         
         self.fingerprinting_scripts = [
             'canvas', 'webgl', 'audio', 'font', 'screen', 'battery', 'webrtc', 'timezone'
         ]
         
+        self.fingerprinting_checks = [
+            ('canvas', 'Canvas Fingerprinting', 'Invisible images reveal unique hardware signatures'),
+            ('webgl', 'WebGL Fingerprinting', '3D graphics capabilities create hardware-specific identity'),
+            ('audiocont', 'Audio Context Fingerprinting', 'Audio hardware creates unique acoustic signatures'),
+            ('getfonts', 'Font Enumeration', 'Installed fonts reveal cultural and professional background'),
+            ('webrtc', 'WebRTC IP Leakage', 'Communication protocols expose real location'),
+            ('battery', 'Battery Status Exposure', 'Power levels enable device tracking')
+        ]
+        
+        # Registrable-domain rules and cookie rules, built once
+        self.public_suffixes = PUBLIC_SUFFIXES
+        self.cookie_rules = CookieRuleTable.load(COOKIE_RULES_PATH)
+        self.thresholds = THREAT_THRESHOLDS
+        
+        # Every string a finding can carry is built here once instead of per analysis
+        self.fingerprinting_table = [
+            FingerprintCheck(
+                pattern=pattern,
+                technique=technique,
+                is_advanced=any(marker in technique.lower() for marker in ADVANCED_FINGERPRINTING_MARKERS),
+                model=FingerprintingMethod(
+                    technique=technique,
+                    detected=False,
+                    description=description,
+                    dataCollected=f"{technique.split()[0].lower()} characteristics and patterns"
+                ),
+                detected_model=FingerprintingMethod(
+                    technique=technique,
+                    detected=True,
+                    description=description + "—a form of digital DNA extraction",
+                    dataCollected=f"{technique.split()[0].lower()} characteristics and patterns",
+                    resistance=f"Use browser extensions to spoof {technique.split()[0].lower()} data"
+                )
+            )
+            for pattern, technique, description in self.fingerprinting_checks
+        ]
+        
+        # One matcher covers every fingerprinting keyword; tracker domains are
+        # matched by looking up the hosts a page references in self.trackers
+        self.matcher = PatternMatcher([pattern for pattern, _, _ in self.fingerprinting_checks])
+        
         self.poetic_keywords = [
             "liberation", "moon", "wildflowers", "disruption", "enchantment", 
             "sisterhood", "fragment", "rupture", "solitude", "sacred"
         ]
+        
+        # Shared HTTP session, owned by the app lifecycle (see startup/shutdown hooks)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def reputation_index(self) -> DomainReputationIndex:
+        return self.trackers.reputation
+
+    async def start(self):
+        """Create the pooled HTTP session used for all outbound fetches"""
+        if self.session is not None and not self.session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_SIZE,
+            limit_per_host=HTTP_POOL_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            use_dns_cache=True,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_FETCH_TIMEOUT),
+            trace_configs=[_tracing_config()]
+        )
 
-    async def analyze_website(self, url: str, options: AnalysisOptions) -> AnalysisResponse:
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Lazily create the pool when used outside the app lifecycle (scripts, benchmarks)
+        if self.session is None or self.session.closed:
+            await self.start()
+        return self.session
+
+    async def analyze_website(self, url: str, options: AnalysisOptions, log: bool = True) -> AnalysisResponse:
+        """Analyze a live website; log=False skips the analysis_logs record and rollups"""
+        ANALYSES_IN_FLIGHT.inc()
+        try:
+            return await self._analyze_website(url, options, log)
+        finally:
+            ANALYSES_IN_FLIGHT.dec()
+
+    async def _analyze_website(self, url: str, options: AnalysisOptions, log: bool = True) -> AnalysisResponse:
         start_time = time.time()
         domain = urlparse(url).netloc
         
         # Initialize environmental tracking
         server_requests = 0
         data_transferred = 0
+        data_saved = 0
         
         # Real data collection
         cookies = []
         fingerprinting_methods = []
         third_parties = []
+        pixel_tags = 0
         
         if options.includeWebScraping:
+            # Hosts that keep failing are refused up front instead of waiting out another timeout
+            host = _hostname(domain)
+            retry_after = host_circuits.check(host)
+            if retry_after is not None:
+                CIRCUIT_REJECTIONS.inc()
+                raise HTTPException(status_code=422, detail=NO_LIVE_DATA_DETAIL, headers=_retry_after(retry_after))
+            
             # Fetch website content
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                        server_requests += 1
-                        content = await response.text()
-                        data_transferred += len(content.encode('utf-8'))
-                        
-                        # Analyze cookies from response headers
-                        if 'set-cookie' in response.headers:
-                            cookies.extend(self._parse_cookies(response.headers.getall('set-cookie'), domain))
-                        
-                        # Analyze scripts for tracking and fingerprinting
-                        fingerprinting_methods.extend(self._analyze_fingerprinting(content))
-                        third_parties.extend(self._analyze_third_parties(content))
+                session = await self._get_session()
+                fetch_started = time.perf_counter()
+                page_key = normalize_url(url)
+                validated = self._validated(page_key)
+                async with session.get(url, headers=self._conditional_headers(validated)) as response:
+                    server_requests += 1
+                    if response.status >= 500 or response.status == 429:
+                        host_circuits.record_failure(host)
+                    else:
+                        host_circuits.record_success(host)
+                    
+                    if response.status == 304 and validated is not None:
+                        # Unchanged since the last analysis: reuse its findings instead of the body
+                        page = validated
+                        data_saved += validated["bytes"]
+                        record_stage('fetch', time.perf_counter() - fetch_started)
+                        cookie_headers = response.headers.getall('set-cookie', []) or validated["cookie_headers"]
+                    else:
+                        cookie_headers = response.headers.getall('set-cookie', [])
                         
+                        # Scan the body as it streams in, or in the process pool when it is large.
+                        # Resources are always collected: the findings are kept for conditional
+                        # re-fetches, which may come from a request that does crawl them
+                        scan = await self._scan_response(response, True)
+                        received = scan["received"]
+                        data_transferred += received
+                        record_stage('decode', scan["decode_seconds"])
+                        record_stage('scan', scan["scan_seconds"])
+                        record_stage('fetch', time.perf_counter() - fetch_started - scan["wall_seconds"])
+                        page = {
+                            "matches": scan["matches"],
+                            "hosts": scan["hosts"],
+                            "resources": scan["resources"],
+                            "pixels": scan["pixels"],
+                            "bytes": received,
+                            "cookie_headers": cookie_headers
+                        }
+                        self._remember_validators(page_key, response, page)
+                    
+                    # Analyze cookies from response headers
+                    cookies.extend(self._parse_cookies(cookie_headers, domain))
+                    page_url = str(response.url)
+                
+                # Most fingerprinting code lives in external bundles, so follow them too
+                matches = dict(page["matches"])
+                hosts = dict(page["hosts"])
+                pixel_tags += len(page["pixels"])
+                if options.includeExternalScripts and page["resources"]:
+                    with timed_stage('crawl'):
+                        crawl = await self._crawl_resources(page_url, page["resources"], matches, hosts)
+                    server_requests += crawl['requests']
+                    data_transferred += crawl['bytes']
+                    data_saved += crawl['saved']
+                    pixel_tags += crawl['pixels']
+                
+                # Analyze scripts for tracking and fingerprinting
+                fingerprinting_methods.extend(self._fingerprinting_from_hits(matches))
+                third_parties.extend(self._third_parties_from_hosts(hosts))
+                    
             except Exception as e:
+                if isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)):
+                    host_circuits.record_failure(host)
+                FETCH_FAILURES.inc()
                 logger.warning(f"Web scraping failed for {url}: {e}")
         
         # If no real data collected, return error instead of fallback
         if not cookies and not fingerprinting_methods:
-            raise HTTPException(
-                status_code=422, 
-                detail={
-                    "error": "no_live_data_available",
-                    "message": "Unable to collect live data from this website. This may be due to website restrictions, security measures, or network issues. Please try again with a different URL or check your connection.",
-                    "suggestions": [
-                        "Try a different website (e.g., facebook.com, twitter.com, amazon.com)",
-                        "Ensure the URL is accessible and not blocked",
-                        "Check your internet connection",
-                        "Some websites may block automated analysis"
-                    ]
-                }
-            )
+            NO_LIVE_DATA.inc()
+            raise HTTPException(status_code=422, detail=NO_LIVE_DATA_DETAIL)
         else:
             data_source = "Live Website Analysis"
             is_real_data = True
@@ -190,31 +2328,41 @@ class PrivacyAnalyzer:
             dataTransfer=f"{data_transferred / 1024:.1f} KB" if data_transferred > 0 else "0 KB",
             energyUsed=f"{processing_time * 0.5:.2f} Wh",
             serverRequests=server_requests,
-            message=f"Analysis completed in {processing_time:.2f}s with minimal environmental impact" if server_requests > 0 else "No environmental impact - using cached educational data"
+            message=f"Analysis completed in {processing_time:.2f}s with minimal environmental impact" if server_requests > 0 else "No environmental impact - using cached educational data",
+            dataSaved=f"{data_saved / 1024:.1f} KB" if data_saved > 0 else None
         )
         
         # Calculate threat level with domain analysis
-        threat_level, threat_description, tracking_indicators = self._calculate_threat_level(
-            cookies, fingerprinting_methods, third_parties, domain
-        )
+        with timed_stage('threat_scoring'):
+            threat_level, threat_description, tracking_indicators = self._calculate_threat_level(
+                cookies, fingerprinting_methods, third_parties, domain, pixel_tags
+            )
         
         # Store analysis for research transparency
         analysis_record = {
             "url": str(url),
             "domain": domain,
+            "base_domain": self.public_suffixes.registrable_domain(_hostname(domain)),
             "timestamp": datetime.utcnow(),
             "threat_level": threat_level,
             "cookies_found": len(cookies),
             "fingerprinting_methods": len(fingerprinting_methods),
             "third_parties": len(third_parties),
+            "third_party_domains": [party.domain for party in third_parties],
             "total_tracking_mechanisms": len(cookies) + len(fingerprinting_methods) + len(third_parties),
             "environmental_impact": environmental_impact.dict(),
             "tracking_indicators": tracking_indicators,
             "is_high_threat_domain": threat_level == "HIGH" and "Known surveillance platform" in threat_description
         }
-        await db.analysis_logs.insert_one(analysis_record)
+        if log:
+            with timed_stage('persist'):
+                await mongo_writer.enqueue('analysis_logs', analysis_record)
+                await record_analysis_rollups(analysis_record)
         
-        fingerprinting_score = min(100, len([fp for fp in fingerprinting_methods if fp.detected]) * 15 + 40)
+        fingerprinting_score = min(100, sum(1 for fp in fingerprinting_methods if fp.detected) * 15 + 40)
+        cookie_models, fingerprinting_models, third_party_models = self._response_findings(
+            cookies, fingerprinting_methods, third_parties
+        )
         
         return AnalysisResponse(
             url=url,
@@ -228,109 +2376,274 @@ class PrivacyAnalyzer:
             dataSource=data_source,
             isRealData=is_real_data,
             poeticKeyword=random.choice(self.poetic_keywords),
-            cookies=cookies,
-            fingerprinting=fingerprinting_methods,
-            thirdParties=third_parties,
+            cookies=cookie_models,
+            fingerprinting=fingerprinting_models,
+            thirdParties=third_party_models,
             environmentalImpact=environmental_impact
         )
 
-    def _parse_cookies(self, cookie_headers: List[str], domain: str) -> List[Cookie]:
+    def _validated(self, key: str) -> Optional[Dict[str, Any]]:
+        cached = page_validators.get(key)
+        return cached[0] if cached is not None else None
+
+    def _conditional_headers(self, validated: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if validated is not None:
+            if validated.get("etag"):
+                headers['If-None-Match'] = validated["etag"]
+            if validated.get("last_modified"):
+                headers['If-Modified-Since'] = validated["last_modified"]
+        return headers
+
+    def _remember_validators(self, key: str, response: aiohttp.ClientResponse, findings: Dict[str, Any]):
+        """Keep the response's validators with its findings so the next fetch can be conditional"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status != 200 or not (etag or last_modified):
+            return
+        page_validators.set(key, {**findings, "etag": etag, "last_modified": last_modified})
+
+    def _new_scanner(self, encoding: Optional[str] = None, collect_resources: bool = False, html: bool = True) -> PageScanner:
+        return PageScanner(self.matcher, encoding, collect_resources, html)
+
+    async def _crawl_resources(self, page_url: str, sources: List[str], matches: Dict[str, int], hosts: Dict[str, int]) -> Dict[str, int]:
+        """Fetch and scan the scripts and iframes a page references, within the crawl budgets.
+
+        Pattern hits are added to matches and host references to hosts. Iframe documents are tokenized like
+        the page itself and searched for further resources up to
+        CRAWL_MAX_DEPTH levels below the page; scripts are scanned in full.
+        """
+        budget = {"resources": CRAWL_MAX_RESOURCES, "bytes": CRAWL_MAX_BYTES}
+        totals = {"requests": 0, "bytes": 0, "saved": 0, "pixels": 0}
+        seen = {normalize_url(page_url)}
+        semaphore = asyncio.Semaphore(max(1, CRAWL_CONCURRENCY))
+        session = await self._get_session()
+
+        async def fetch(resource_url: str) -> List[str]:
+            async with semaphore:
+                # Reserve bytes up front so concurrent fetches cannot overrun the budget
+                reserved = min(budget["bytes"], CRAWL_MAX_RESOURCE_BYTES)
+                if reserved <= 0:
+                    return []
+                budget["bytes"] -= reserved
+                received = 0
+                try:
+                    resource_key = normalize_url(resource_url)
+                    validated = self._validated(resource_key)
+                    async with session.get(resource_url, headers=self._conditional_headers(validated)) as response:
+                        totals["requests"] += 1
+                        if response.status == 304 and validated is not None:
+                            totals["saved"] += validated["bytes"]
+                            result = validated
+                        elif response.status >= 400:
+                            return []
+                        else:
+                            is_document = 'html' in (response.content_type or '')
+                            body, received = await self._read_body(response, reserved)
+                            # Documents always list their resources, whatever their depth, so the
+                            # remembered findings serve any later crawl
+                            result = await self._scan_resource(body, response.charset, is_document, is_document)
+                            self._remember_validators(resource_key, response, {**result, "bytes": len(body)})
+                        for pattern, count in result["matches"].items():
+                            matches[pattern] = matches.get(pattern, 0) + count
+                        for host, count in result["hosts"].items():
+                            hosts[host] = hosts.get(host, 0) + count
+                        totals["pixels"] += len(result["pixels"])
+                        return [urljoin(str(response.url), src) for src in result["resources"]]
+                except Exception as e:
+                    logger.info(f"Could not fetch resource {resource_url}: {e}")
+                    return []
+                finally:
+                    budget["bytes"] += reserved - min(received, reserved)
+                    totals["bytes"] += received
+
+        level = [urljoin(page_url, src) for src in sources]
+        for _ in range(CRAWL_MAX_DEPTH):
+            batch = []
+            for resource_url in level:
+                key = normalize_url(resource_url)
+                if urlparse(resource_url).scheme not in ('http', 'https') or key in seen:
+                    continue
+                if budget["resources"] <= 0:
+                    break
+                seen.add(key)
+                budget["resources"] -= 1
+                batch.append(resource_url)
+            if not batch:
+                break
+            found = await asyncio.gather(*(fetch(resource_url) for resource_url in batch))
+            level = [resource_url for urls in found for resource_url in urls]
+
+        return totals
+
+    async def _read_body(self, response: aiohttp.ClientResponse, max_bytes: int) -> tuple:
+        """Read up to max_bytes of the body, returning (body, bytes received)"""
+        body = bytearray()
+        received = 0
+        async for chunk in response.content.iter_chunked(ANALYZE_CHUNK_SIZE):
+            received += len(chunk)
+            body += chunk[:max_bytes - len(body)]
+            if len(body) >= max_bytes:
+                logger.info(f"Stopped reading {response.url} at the {max_bytes} byte limit")
+                break
+        return bytes(body), received
+
+    async def _scan_resource(self, body: bytes, encoding: Optional[str], collect_resources: bool, html: bool = False) -> Dict[str, Any]:
+        """Pattern hits (and nested resources) for a crawled body, reusing results for known content"""
+        key = ScanResultCache.key(self.matcher, body)
+        if html:
+            key += '-html'
+        if collect_resources:
+            key += '-resources'
+        cached = await scan_results.get(key)
+        if cached is not None:
+            return cached
+        scanned = await scan_offloader.scan(self.matcher, body, encoding, collect_resources, html)
+        record_stage('scan', scanned["scan_seconds"])
+        result = {key: scanned[key] for key in ("matches", "hosts", "resources", "pixels")}
+        await scan_results.set(key, result)
+        return result
+
+    async def _scan_response(self, response: aiohttp.ClientResponse, collect_resources: bool) -> Dict[str, Any]:
+        """Scan a page body as it streams in, moving to the scan process pool if it turns out large.
+
+        Chunks are fed to a PageScanner on the event loop. While the pool is
+        running they are also kept, up to the offload threshold; a body that
+        crosses it, or declares a larger Content-Length, is read to the end
+        (within ANALYZE_MAX_BYTES) and handed to a worker process in one piece.
+        The result includes wall_seconds, the time spent scanning as seen by
+        this coroutine.
+        """
+        # Only HTML is tokenized; a URL that serves a script or JSON is matched in full
+        html = 'html' in (response.content_type or '')
+        scanner = self._new_scanner(response.charset, collect_resources, html)
+        kept = bytearray() if scan_offloader.enabled else None
+        received = 0
+        if kept is None or not scan_offloader.should_offload(response.content_length or 0):
+            received = await self._stream_body(response, scanner, kept=kept)
+            if kept is None or not scan_offloader.should_offload(len(kept)):
+                result = scan_summary(scanner)
+                return {**result, "received": received, "wall_seconds": result["decode_seconds"] + result["scan_seconds"]}
+        
+        # Too large for the event loop: read the rest and scan the whole body in a worker
+        rest, rest_received = await self._read_body(response, ANALYZE_MAX_BYTES - len(kept))
+        body = bytes(kept) + rest
+        started = time.perf_counter()
+        result = await scan_offloader.scan(self.matcher, body, response.charset, collect_resources, html)
+        streamed_seconds = scanner.decode_seconds + scanner.scan_seconds
+        return {
+            **result,
+            "received": received + rest_received,
+            "wall_seconds": streamed_seconds + time.perf_counter() - started
+        }
+
+    async def _stream_body(self, response: aiohttp.ClientResponse, scanner: PageScanner, max_bytes: int = ANALYZE_MAX_BYTES, kept: Optional[bytearray] = None) -> int:
+        """Feed the response body to the scanner chunk by chunk, returning the bytes received.
+
+        With kept, the raw bytes are collected there too, and streaming stops
+        (leaving the scanner open) as soon as they pass the offload threshold.
+        """
+        received = 0
+        async for chunk in response.content.iter_chunked(ANALYZE_CHUNK_SIZE):
+            received += len(chunk)
+            remaining = max_bytes - scanner.bytes_scanned
+            if kept is not None:
+                kept += chunk[:remaining]
+                if scan_offloader.should_offload(len(kept)):
+                    return received
+            if len(chunk) >= remaining:
+                scanner.feed(chunk[:remaining])
+                logger.info(f"Stopped reading {response.url} at the {max_bytes} byte limit")
+                break
+            scanner.feed(chunk)
+        scanner.close()
+        return received
+
+    def _parse_cookies(self, cookie_headers: List[str], domain: str) -> List[CookieFinding]:
         cookies = []
+        now = datetime.utcnow()
         for header in cookie_headers:
-            # Basic cookie parsing
-            parts = header.split(';')
-            if parts:
-                name_value = parts[0].strip().split('=', 1)
-                if len(name_value) == 2:
-                    name, _ = name_value
-                    cookie_info = self._analyze_cookie_purpose(name, domain)
-                    cookies.append(Cookie(
-                        name=name,
-                        type=cookie_info['type'],
-                        purpose=cookie_info['purpose'],
-                        domain=domain,
-                        expiry=self._extract_expiry(header),
-                        critique=cookie_info.get('critique'),
-                        isReal=True
-                    ))
+            cookie = parse_set_cookie(header)
+            if cookie is None:
+                continue
+            lifetime = cookie.lifetime(now)
+            if lifetime is not None and lifetime <= 0:
+                # An already-expired cookie deletes any earlier one rather than setting a tracker
+                continue
+            cookie_type, purpose, critique = self._analyze_cookie_purpose(cookie.name, domain)
+            cookies.append(CookieFinding(
+                cookie.name, cookie_type, purpose, critique, cookie.domain or domain,
+                describe_cookie_lifetime(lifetime),
+                PIXEL_COOKIE_PATTERN.search(cookie.name.lower()) is not None,
+                cookie.path, cookie.secure, cookie.http_only, cookie.same_site
+            ))
         return cookies
 
-    def _analyze_cookie_purpose(self, name: str, domain: str) -> Dict[str, str]:
-        # Analyze cookie based on common patterns
-        if '_ga' in name or 'analytics' in name.lower():
-            return {
-                'type': 'behavioral tracking',
-                'purpose': 'Google Analytics - constructs behavioral profiles across digital spaces',
-                'critique': 'Creates persistent identity markers for surveillance capitalism'
-            }
-        elif '_fb' in name or 'facebook' in name.lower():
-            return {
-                'type': 'advertising surveillance',
-                'purpose': 'Facebook tracking - builds psychographic profiles for manipulation',
-                'critique': 'Enables cross-platform behavioral modification and social control'
-            }
-        elif 'doubleclick' in name.lower():
-            return {
-                'type': 'cross-site tracking',
-                'purpose': 'Google DoubleClick - omnipresent user identification',
-                'critique': 'Creates persistent shadow profiles across the web'
-            }
-        else:
-            return {
-                'type': 'unknown tracking',
-                'purpose': f'Unclassified tracking cookie from {domain}',
-                'critique': 'Purpose unclear - potential privacy violation'
-            }
+    def _analyze_cookie_purpose(self, name: str, domain: str) -> tuple:
+        """(type, purpose, critique) for a cookie name, from the compiled rule table"""
+        classification = self.cookie_rules.classify(name)
+        if classification is not None:
+            return classification
+        return ('unknown tracking', f'Unclassified tracking cookie from {domain}', 'Purpose unclear - potential privacy violation')
 
-    def _extract_expiry(self, cookie_header: str) -> str:
-        # Extract expiry from cookie header
-        if 'max-age' in cookie_header.lower():
-            return 'Session-based'
-        elif 'expires' in cookie_header.lower():
-            return 'Long-term'
-        return 'Session'
+    def _scan_text(self, content: str) -> Dict[str, Any]:
+        body = content.encode('utf-8')
+        key = ScanResultCache.key(self.matcher, body) + '-html'
+        cached = scan_results.get_local(key)
+        if cached is not None:
+            return cached
+        scanner = self._new_scanner()
+        scanner.feed(body)
+        scanner.close()
+        result = {"matches": scanner.matches, "hosts": scanner.hosts, "resources": [], "pixels": scanner.pixels}
+        scan_results.set_local(key, result)
+        return result
 
-    def _analyze_fingerprinting(self, content: str) -> List[FingerprintingMethod]:
-        methods = []
-        content_lower = content.lower()
-        
-        fingerprinting_checks = [
-            ('canvas', 'Canvas Fingerprinting', 'Invisible images reveal unique hardware signatures'),
-            ('webgl', 'WebGL Fingerprinting', '3D graphics capabilities create hardware-specific identity'),
-            ('audiocont', 'Audio Context Fingerprinting', 'Audio hardware creates unique acoustic signatures'),
-            ('getfonts', 'Font Enumeration', 'Installed fonts reveal cultural and professional background'),
-            ('webrtc', 'WebRTC IP Leakage', 'Communication protocols expose real location'),
-            ('battery', 'Battery Status Exposure', 'Power levels enable device tracking')
+    def _analyze_fingerprinting(self, content: str) -> List[FingerprintFinding]:
+        return self._fingerprinting_from_hits(self._scan_text(content)["matches"])
+
+    def _fingerprinting_from_hits(self, hits: Dict[str, int]) -> List[FingerprintFinding]:
+        return [FingerprintFinding(check, check.pattern in hits) for check in self.fingerprinting_table]
+
+    def _analyze_third_parties(self, content: str) -> List[ThirdPartyFinding]:
+        return self._third_parties_from_hosts(self._scan_text(content)["hosts"])
+
+    def _third_parties_from_hosts(self, hosts: Dict[str, int]) -> List[ThirdPartyFinding]:
+        # Report every listed tracker domain the content references, counting references to any of its hosts
+        trackers = self.trackers
+        counts: Dict[str, int] = {}
+        for host, count in hosts.items():
+            domain = trackers.lookup(host)
+            if domain is not None:
+                counts[domain] = counts.get(domain, 0) + count
+        return [
+            ThirdPartyFinding(
+                domain, *trackers.trackers[domain], count,
+                any(keyword in domain for keyword in MAJOR_TRACKER_KEYWORDS),
+                domain in PLATFORM_TRACKER_DOMAINS
+            )
+            for domain, count in counts.items()
         ]
-        
-        for pattern, technique, description in fingerprinting_checks:
-            detected = pattern in content_lower
-            methods.append(FingerprintingMethod(
-                technique=technique,
-                detected=detected,
-                description=description + "—a form of digital DNA extraction" if detected else description,
-                dataCollected=f"{technique.split()[0].lower()} characteristics and patterns",
-                resistance=f"Use browser extensions to spoof {technique.split()[0].lower()} data" if detected else None
-            ))
-        
-        return methods
 
-    def _analyze_third_parties(self, content: str) -> List[ThirdParty]:
-        parties = []
-        
-        # Look for common third-party domains in the content
-        for domain, info in self.known_trackers.items():
-            if domain in content:
-                parties.append(ThirdParty(
-                    domain=domain,
-                    category=info['category'],
-                    purpose=f"Detected {info['type']} scripts and trackers",
-                    requests=content.count(domain),
-                    dataShared="Behavioral patterns, device information, interaction data",
-                    critique=f"Commodifies human attention and agency for {info['category']}"
-                ))
-        
-        return parties
+    def _response_findings(self, cookies: List[CookieFinding], fingerprinting: List[FingerprintFinding], third_parties: List[ThirdPartyFinding]) -> tuple:
+        """Convert detector records into the response models.
+
+        Fingerprinting results are static per check and outcome, so those
+        models come straight from the precomputed table and are shared.
+        """
+        cookie_models = [
+            Cookie(name=c.name, type=c.type, purpose=c.purpose, domain=c.domain,
+                   expiry=c.expiry, critique=c.critique, isReal=True,
+                   path=c.path, secure=c.secure, httpOnly=c.http_only, sameSite=c.same_site)
+            for c in cookies
+        ]
+        fingerprinting_models = [f.check.detected_model if f.detected else f.check.model for f in fingerprinting]
+        third_party_models = [
+            ThirdParty(domain=t.domain, category=t.category, purpose=t.purpose, requests=t.requests,
+                       dataShared="Behavioral patterns, device information, interaction data", critique=t.critique)
+            for t in third_parties
+        ]
+        return cookie_models, fingerprinting_models, third_party_models
 
     def _calculate_carbon_footprint(self, data_bytes: int, processing_time: float, requests: int) -> float:
         # Simplified carbon footprint calculation
@@ -341,98 +2654,62 @@ class PrivacyAnalyzer:
         
         return data_carbon + processing_carbon + request_carbon
 
-    def _calculate_threat_level(self, cookies: List[Cookie], fingerprinting: List[FingerprintingMethod], third_parties: List[ThirdParty], domain: str) -> tuple:
+    def _calculate_threat_level(self, cookies: List[CookieFinding], fingerprinting: List[FingerprintFinding], third_parties: List[ThirdPartyFinding], domain: str, pixel_tags: int = 0) -> tuple:
         """Calculate threat level based on total tracking mechanisms and domain reputation"""
         
         # Count total tracking mechanisms
         total_tracking = len(cookies) + len(fingerprinting) + len(third_parties)
         
-        # Known high-threat domains (surveillance capitalism companies)
-        high_threat_domains = {
-            # Meta/Facebook ecosystem
-            'facebook.com', 'fb.com', 'meta.com', 'instagram.com', 'whatsapp.com',
-            # Google ecosystem  
-            'google.com', 'gmail.com', 'youtube.com', 'googlesyndication.com', 'doubleclick.net',
-            'googletagmanager.com', 'googleanalytics.com', 'googlepixel.com',
-            # Amazon ecosystem
-            'amazon.com', 'amazonpay.com', 'amazonaws.com', 'amazon-adsystem.com',
-            # Microsoft ecosystem
-            'microsoft.com', 'bing.com', 'office.com', 'outlook.com', 'msn.com',
-            # Marketing/Tracking platforms
-            'hubspot.com', 'salesforce.com', 'marketo.com', 'mailchimp.com',
-            # E-commerce tracking heavy
-            'temu.com', 'aliexpress.com', 'shopify.com', 'wix.com',
-            # Ad networks and tracking
-            'criteo.com', 'outbrain.com', 'taboola.com', 'branch.io',
-            # Analytics and pixels
-            'hotjar.com', 'fullstory.com', 'amplitude.com', 'mixpanel.com', 'segment.com',
-            # Social media
-            'twitter.com', 'x.com', 'linkedin.com', 'pinterest.com', 'snapchat.com', 'tiktok.com',
-            # News and media (heavy tracking)
-            'cnn.com', 'nytimes.com', 'washingtonpost.com', 'buzzfeed.com'
-        }
-        
-        # Extract base domain (remove subdomains for matching)
-        domain_parts = domain.lower().split('.')
-        if len(domain_parts) >= 2:
-            base_domain = '.'.join(domain_parts[-2:])  # e.g., "www.facebook.com" -> "facebook.com"
-        else:
-            base_domain = domain.lower()
-        
-        # Check if domain is known for heavy tracking
-        is_high_threat_domain = any(threat_domain in base_domain or base_domain in threat_domain 
-                                  for threat_domain in high_threat_domains)
+        # Reputation lookups walk the host's labels against the prebuilt index
+        host = _hostname(domain)
+        base_domain = self.public_suffixes.registrable_domain(host)
+        is_high_threat_domain = self.reputation_index.lookup(host) is not None
         
         # Additional indicators of tracking-heavy sites
         tracking_indicators = []
         
-        # Check for tracking pixels in cookies
-        pixel_cookies = [c for c in cookies if any(pixel in c.name.lower() 
-                        for pixel in ['pixel', 'track', 'analytics', 'gtm', 'fbp', '_ga', '_gid'])]
+        # Check for tracking pixels in cookies (flags are set when the records are built)
+        pixel_cookies = sum(1 for c in cookies if c.is_pixel)
         if pixel_cookies:
-            tracking_indicators.append(f"{len(pixel_cookies)} tracking pixels")
+            tracking_indicators.append(f"{pixel_cookies} tracking pixels")
+        
+        # Pixel-style <img> tags found by the tokenizer
+        if pixel_tags:
+            tracking_indicators.append(f"{pixel_tags} pixel tags")
         
         # Check for fingerprinting techniques
-        advanced_fingerprinting = [f for f in fingerprinting if any(technique in f.technique.lower() 
-                                 for technique in ['canvas', 'webgl', 'audio', 'battery', 'webrtc']) and f.detected]
+        advanced_fingerprinting = sum(1 for f in fingerprinting if f.detected and f.check.is_advanced)
         if advanced_fingerprinting:
-            tracking_indicators.append(f"{len(advanced_fingerprinting)} advanced fingerprinting")
+            tracking_indicators.append(f"{advanced_fingerprinting} advanced fingerprinting")
         
         # Check for third-party trackers
-        major_trackers = [t for t in third_parties if any(tracker in t.domain.lower() 
-                         for tracker in ['google', 'facebook', 'amazon', 'microsoft', 'adobe'])]
+        major_trackers = sum(1 for t in third_parties if t.is_major)
         if major_trackers:
-            tracking_indicators.append(f"{len(major_trackers)} major trackers")
+            tracking_indicators.append(f"{major_trackers} major trackers")
         
         # Determine threat level
-        if is_high_threat_domain or total_tracking >= 16:
+        thresholds = self.thresholds
+        if is_high_threat_domain or total_tracking >= thresholds.high:
             threat_level = "HIGH"
-            description = f"Surveillance-heavy domain with {total_tracking} tracking mechanisms"
-        elif total_tracking >= 10:
+        elif total_tracking >= thresholds.medium:
             threat_level = "MEDIUM" 
-            description = f"Moderate tracking with {total_tracking} mechanisms detected"
         else:
             threat_level = "LOW"
-            description = f"Minimal tracking with {total_tracking} mechanisms detected"
-        
-        # Override for known surveillance platforms
-        if is_high_threat_domain:
-            threat_level = "HIGH"
-            description = f"Known surveillance platform ({base_domain}) with extensive tracking infrastructure"
         
         # Personal website detection (low threat override)
         personal_indicators = [
-            len(cookies) <= 3,  # Few cookies
-            len(third_parties) <= 2,  # Minimal third parties
-            not any(tracker in domain.lower() for tracker in ['google', 'facebook', 'amazon', 'microsoft']),
-            not any(t.domain.lower() in ['google-analytics', 'facebook-pixel', 'google-tag-manager'] 
-                   for t in third_parties)
+            len(cookies) <= thresholds.personalMaxCookies,  # Few cookies
+            len(third_parties) <= thresholds.personalMaxThirdParties,  # Minimal third parties
+            not any(tracker in domain.lower() for tracker in PLATFORM_DOMAIN_KEYWORDS),
+            not any(t.is_platform for t in third_parties)
         ]
         
-        if sum(personal_indicators) >= 3 and total_tracking <= 5:
+        personal = sum(personal_indicators) >= thresholds.personalMinIndicators and total_tracking <= thresholds.personalMaxTracking
+        if personal:
             threat_level = "LOW"
-            description = f"Personal/minimal tracking website with {total_tracking} mechanisms"
         
+        # Known surveillance platforms are named in the description
+        description = describe_threat(threat_level, total_tracking, personal, base_domain if is_high_threat_domain else None)
         return threat_level, description, tracking_indicators
 
     def _get_educational_cookies(self, domain: str) -> List[Cookie]:
@@ -491,6 +2768,39 @@ class PrivacyAnalyzer:
 # Initialize analyzer
 privacy_analyzer = PrivacyAnalyzer()
 
+# Recent analyses, keyed by normalized URL and analysis options
+analysis_cache = TTLCache(ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL)
+
+# Recent no_live_data_available results, so repeat requests fail fast with the same error
+failed_analyses = TTLCache(ANALYSIS_CACHE_SIZE, NEGATIVE_CACHE_TTL)
+
+# Hosts whose fetches keep failing are skipped for a while
+host_circuits = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_OPEN_SECONDS, HTTP_FETCH_TIMEOUT, CIRCUIT_MAX_HOSTS)
+
+# Picks up edited tracker and reputation lists without a restart
+tracker_reloader = TrackerDatabaseReloader(privacy_analyzer, TRACKER_LIST_DIR, REPUTATION_LIST_PATH, TRACKER_RELOAD_INTERVAL)
+
+# Validators and findings per URL, so re-analysis can revalidate instead of re-downloading
+page_validators = TTLCache(PAGE_VALIDATOR_CACHE_SIZE, PAGE_VALIDATOR_TTL)
+
+# Process pool for scanning large bodies off the event loop
+scan_offloader = ScanOffloader(SCAN_PROCESS_WORKERS, SCAN_OFFLOAD_BYTES)
+
+# Scan results for crawled scripts, shared across every site that serves the same bundle
+scan_results = ScanResultCache(SCAN_CACHE_SIZE, SCAN_CACHE_BACKEND, SCAN_CACHE_DIR)
+
+# Concurrent analyses of the same URL and options share one outbound fetch
+analysis_flights = SingleFlight()
+
+# Politeness limits shared by every batch, so concurrent batches can't gang up on one host
+batch_host_limiter = HostLimiter(BATCH_PER_HOST_CONCURRENCY)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin API disabled - set ADMIN_TOKEN to enable it")
+    if not hmac.compare_digest(x_admin_token or '', ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
@@ -506,22 +2816,181 @@ async def analyze_website(request: AnalysisRequest):
             "options": request.options.dict(),
             "user_consent": True
         }
-        await db.analysis_requests.insert_one(analysis_record)
-        
-        # Perform analysis
-        result = await privacy_analyzer.analyze_website(request.url, request.options)
+        await mongo_writer.enqueue('analysis_requests', analysis_record)
         
-        # Store results (without personal data)
-        result_record = result.dict()
-        result_record["_id"] = str(uuid.uuid4())
-        await db.analysis_results.insert_one(result_record)
-        
-        return result
+        # Perform analysis, served from the cache or shared with concurrent callers when possible
+        payload = await _cached_analysis(request.url, request.options)
+        return FastJSONResponse(payload, headers={"X-Cache": "HIT" if payload["cache"]["hit"] else "MISS"})
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Analysis failed for {request.url}: {e}")
         raise HTTPException(status_code=500, detail="Analysis failed")
 
+async def _cached_analysis(url: str, options: AnalysisOptions) -> Dict[str, Any]:
+    """AnalysisResponse payload as a plain dict, ready for dump_json"""
+    # Serve repeat analyses from the cache, with a fresh keyword and timestamp
+    cache_key = analysis_cache_key(url, options)
+    cached = analysis_cache.get(cache_key)
+    if cached is None:
+        failed = failed_analyses.get(cache_key)
+        if failed is not None:
+            CACHE_LOOKUPS.inc(result='negative')
+            detail, age = failed
+            raise HTTPException(status_code=422, detail=detail, headers=_retry_after(failed_analyses.ttl - age))
+    CACHE_LOOKUPS.inc(result='miss' if cached is None else 'hit')
+    if cached is not None:
+        payload, age = cached
+        return {
+            **payload,
+            "poeticKeyword": random.choice(privacy_analyzer.poetic_keywords),
+            "analysisTimestamp": datetime.utcnow().isoformat(),
+            "cache": {"hit": True, "ageSeconds": round(age, 3), "ttlSeconds": analysis_cache.ttl}
+        }
+    
+    # Perform analysis once for all concurrent callers of this URL
+    payload = await analysis_flights.run(cache_key, lambda: _analyze_and_store(url, options, cache_key))
+    return {**payload, "cache": {"hit": False, "ageSeconds": 0.0, "ttlSeconds": analysis_cache.ttl}}
+
+async def _analyze_and_store(url: str, options: AnalysisOptions, cache_key: tuple) -> Dict[str, Any]:
+    try:
+        result = await privacy_analyzer.analyze_website(url, options)
+    except HTTPException as e:
+        if e.status_code == 422:
+            failed_analyses.set(cache_key, e.detail)
+        raise
+    
+    # Serialize once: the same payload is cached, stored and rendered for clients
+    payload = result.dict()
+    analysis_cache.set(cache_key, payload)
+    
+    # Store results (without personal data)
+    await mongo_writer.enqueue('analysis_results', {**payload, "_id": str(uuid.uuid4())})
+    
+    return payload
+
+@api_router.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalysisRequest):
+    """Analyze many URLs with shared options, streaming one NDJSON line per URL as it completes"""
+    if len(request.urls) > BATCH_MAX_URLS:
+        raise HTTPException(status_code=413, detail=f"Batch too large - at most {BATCH_MAX_URLS} URLs per request")
+    concurrency = max(1, min(request.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY))
+    
+    # Store analysis requests for transparency
+    requested_at = datetime.utcnow()
+    for url in request.urls:
+        await mongo_writer.enqueue('analysis_requests', {
+            "url": url,
+            "timestamp": requested_at,
+            "options": request.options.dict(),
+            "user_consent": True,
+            "batch": True
+        })
+    
+    return StreamingResponse(
+        _stream_batch(request.urls, request.options, concurrency),
+        media_type="application/x-ndjson"
+    )
+
+async def _stream_batch(urls: List[str], options: AnalysisOptions, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def analyze_one(index: int, url: str) -> Dict[str, Any]:
+        # Wait for the host slot first so queued same-host URLs don't hold batch slots
+        async with batch_host_limiter.limit(urlparse(url).hostname or url):
+            async with semaphore:
+                try:
+                    result = await _cached_analysis(url, options)
+                    return {"index": index, "url": url, "status": 200, "result": result}
+                except HTTPException as e:
+                    return {"index": index, "url": url, "status": e.status_code, "error": e.detail}
+                except Exception as e:
+                    logger.error(f"Batch analysis failed for {url}: {e}")
+                    return {"index": index, "url": url, "status": 500, "error": "Analysis failed"}
+    
+    tasks = [asyncio.ensure_future(analyze_one(index, url)) for index, url in enumerate(urls)]
+    succeeded = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            line = await next_result
+            succeeded += line["status"] == 200
+            yield dump_json(line) + b"\n"
+        yield dump_json({"done": True, "total": len(urls), "succeeded": succeeded, "failed": len(urls) - succeeded}) + b"\n"
+    finally:
+        # Client went away mid-stream: stop the remaining analyses
+        for task in tasks:
+            task.cancel()
+
+# Slow analyses can run in the background and be polled or delivered to a callback URL
+analysis_jobs = AnalysisJobQueue('analysis_jobs', ANALYSIS_JOB_WORKERS, ANALYSIS_JOB_QUEUE_SIZE, _cached_analysis)
+
+@api_router.post("/analyze/jobs", status_code=202)
+async def submit_analysis_job(request: AnalysisJobRequest):
+    """Queue an analysis and return its job id immediately"""
+    await mongo_writer.enqueue('analysis_requests', {
+        "url": request.url,
+        "timestamp": datetime.utcnow(),
+        "options": request.options.dict(),
+        "user_consent": True,
+        "job": True
+    })
+    job = await analysis_jobs.submit(request)
+    return {
+        "jobId": job["_id"],
+        "status": job["status"],
+        "statusUrl": f"{api_router.prefix}/analyze/jobs/{job['_id']}",
+        "queueDepth": analysis_jobs.depth
+    }
+
+@api_router.get("/analyze/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    job = await analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return _public_job(job)
+
+# Watchlist of URLs rescanned on a schedule; only changes are logged
+watchlist_scheduler = WatchlistScheduler(
+    'watchlist', WATCHLIST_CONCURRENCY, WATCHLIST_PER_HOST_CONCURRENCY,
+    WATCHLIST_HOST_DELAY, WATCHLIST_POLL_INTERVAL, WATCHLIST_JITTER
+)
+
+def _public_watchlist_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": entry["_id"], **{key: value for key, value in entry.items() if key != "_id"}}
+
+@api_router.get("/watchlist", dependencies=[Depends(require_admin)])
+async def list_watchlist(limit: int = Query(100, ge=1, le=1000), skip: int = Query(0, ge=0)):
+    entries = await db.watchlist.find().sort("_id", 1).skip(skip).limit(limit).to_list(limit)
+    return {"enabled": WATCHLIST_ENABLED, "entries": [_public_watchlist_entry(entry) for entry in entries]}
+
+@api_router.post("/watchlist", dependencies=[Depends(require_admin)])
+async def add_watchlist_entry(entry: WatchlistEntryCreate):
+    return _public_watchlist_entry(await watchlist_scheduler.add(entry))
+
+@api_router.delete("/watchlist", dependencies=[Depends(require_admin)])
+async def remove_watchlist_entry(url: str):
+    if not await watchlist_scheduler.remove(url):
+        raise HTTPException(status_code=404, detail="URL is not on the watchlist")
+    return {"removed": normalize_url(url)}
+
+@api_router.delete("/admin/cache", dependencies=[Depends(require_admin)])
+async def invalidate_analysis_cache(url: Optional[str] = None):
+    """Drop cached analyses for one URL (any options), or the whole cache when no URL is given"""
+    if url:
+        normalized = normalize_url(url)
+        invalidated = analysis_cache.invalidate(lambda key: key[0] == normalized)
+        failed_analyses.invalidate(lambda key: key[0] == normalized)
+    else:
+        invalidated = analysis_cache.clear()
+        failed_analyses.clear()
+    return {"invalidated": invalidated, "remaining": len(analysis_cache)}
+
+@api_router.post("/admin/trackers/reload", dependencies=[Depends(require_admin)])
+async def reload_tracker_lists(force: bool = True):
+    """Rebuild the tracker database from the list files; with force=false only if one changed"""
+    return await tracker_reloader.reload(force)
+
 @api_router.post("/poison")
 async def execute_poison(request: PoisonRequest):
     try:
@@ -607,9 +3076,9 @@ async def execute_poison(request: PoisonRequest):
             "processingTime": processing_time,
             "carbonFootprint": f"{carbon_footprint:.4f}g CO₂"
         }
-        await db.poison_actions.insert_one(poison_record)
+        await mongo_writer.enqueue('poison_actions', poison_record)
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "poisonedCookies": poisoned_cookies,
             "fingerprintObfuscations": fingerprint_obfuscations,
@@ -624,7 +3093,7 @@ async def execute_poison(request: PoisonRequest):
             },
             "resistanceLevel": "Digital Liberation Achieved",
             "feministCritique": "Algorithmic surveillance apparatus disrupted through playful technological resistance"
-        }
+        })
         
     except Exception as e:
         logger.error(f"Cookie poisoning failed: {e}")
@@ -708,14 +3177,492 @@ async def create_status_check(input: StatusCheckCreate):
     _ = await db.status_checks.insert_one(status_obj.dict())
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+STATUS_FIELDS = ('id', 'client_name', 'timestamp')
+
+def _encode_status_cursor(document: Dict[str, Any]) -> str:
+    payload = json.dumps([document['timestamp'].isoformat(), document['id']])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def _decode_status_cursor(cursor: str) -> tuple:
+    try:
+        timestamp, status_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(timestamp), str(status_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+@api_router.get("/status", response_model=StatusCheckPage, response_model_exclude_unset=True)
+async def get_status_checks(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    client_name: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of id,client_name,timestamp")
+):
+    """Newest-first page of status checks; pass nextCursor back as cursor to walk the collection"""
+    requested = [field.strip() for field in fields.split(',') if field.strip()] if fields else list(STATUS_FIELDS)
+    unknown = set(requested) - set(STATUS_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    
+    query: Dict[str, Any] = {}
+    if client_name:
+        query['client_name'] = client_name
+    if cursor:
+        timestamp, status_id = _decode_status_cursor(cursor)
+        query['$or'] = [
+            {'timestamp': {'$lt': timestamp}},
+            {'timestamp': timestamp, 'id': {'$lt': status_id}}
+        ]
+    
+    # Sort keys are always fetched so the next cursor can be built from the last row
+    projection = {'_id': 0, 'timestamp': 1, 'id': 1, **{field: 1 for field in requested}}
+    documents = await db.status_checks.find(query, projection) \
+        .sort([('timestamp', -1), ('id', -1)]) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+    
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    return StatusCheckPage(
+        items=[StatusCheckFields(**{field: document.get(field) for field in requested}) for document in documents],
+        nextCursor=_encode_status_cursor(documents[-1]) if has_more else None
+    )
+
+# Historical analytics over analysis_logs (server-side aggregation)
+AnalyticsBucket = Literal['hour', 'day', 'week', 'month']
+AnalyticsSource = Literal['raw', 'rollup']
+THREAT_LEVELS = ("HIGH", "MEDIUM", "LOW")
+# Watchlist rescans log only diffs; raw analytics count full analyses
+ANALYSIS_RECORDS_ONLY = {"record_type": {"$ne": "rescan_diff"}}
+
+def _bucket_expression(field: str, bucket: str) -> Dict[str, Any]:
+    """Truncate a date field to the bucket start ($dateFromParts works on MongoDB < 5.0 too)"""
+    date = f"${field}"
+    if bucket == 'week':
+        return {"$dateFromParts": {"isoWeekYear": {"$isoWeekYear": date}, "isoWeek": {"$isoWeek": date}}}
+    parts = {"year": {"$year": date}, "month": {"$month": date}}
+    if bucket in ('day', 'hour'):
+        parts["day"] = {"$dayOfMonth": date}
+    if bucket == 'hour':
+        parts["hour"] = {"$hour": date}
+    return {"$dateFromParts": parts}
+
+def _require_rollup_bucket(bucket: str):
+    if bucket == 'hour':
+        raise HTTPException(status_code=400, detail="Rollups are daily - use source=raw for hourly buckets")
+
+@api_router.get("/analytics/domains/{domain}/threat-trend")
+async def domain_threat_trend(
+    domain: str,
+    days: int = Query(30, ge=1, le=3660),
+    bucket: AnalyticsBucket = 'day',
+    source: AnalyticsSource = 'raw'
+):
+    """Threat levels recorded for a registrable domain, counted per time bucket"""
+    base_domain = privacy_analyzer.public_suffixes.registrable_domain(_hostname(domain))
+    since = datetime.utcnow() - timedelta(days=days)
+    
+    if source == 'rollup':
+        _require_rollup_bucket(bucket)
+        pipeline = [
+            {"$match": {"domain": base_domain, "day": {"$gte": since.replace(hour=0, minute=0, second=0, microsecond=0)}}},
+            {"$group": {
+                "_id": _bucket_expression("day", bucket),
+                **{level: {"$sum": {"$ifNull": [f"$threat_levels.{level}", 0]}} for level in THREAT_LEVELS},
+                "total": {"$sum": "$total"}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        rows = await db.analysis_daily_rollups.aggregate(pipeline).to_list(None)
+    else:
+        pipeline = [
+            {"$match": {"base_domain": base_domain, "timestamp": {"$gte": since}, **ANALYSIS_RECORDS_ONLY}},
+            {"$group": {
+                "_id": _bucket_expression("timestamp", bucket),
+                **{level: {"$sum": {"$cond": [{"$eq": ["$threat_level", level]}, 1, 0]}} for level in THREAT_LEVELS},
+                "total": {"$sum": 1}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        rows = await db.analysis_logs.aggregate(pipeline).to_list(None)
+    
+    return {
+        "domain": base_domain,
+        "bucket": bucket,
+        "source": source,
+        "trend": [{"bucket": row.pop("_id"), **row} for row in rows]
+    }
+
+@api_router.get("/analytics/trackers/top")
+async def top_trackers(
+    days: int = Query(30, ge=1, le=3660),
+    limit: int = Query(20, ge=1, le=500),
+    source: AnalyticsSource = 'raw'
+):
+    """Third-party tracker domains seen in the most analyses"""
+    since = datetime.utcnow() - timedelta(days=days)
+    
+    if source == 'rollup':
+        pipeline = [
+            {"$match": {"day": {"$gte": since.replace(hour=0, minute=0, second=0, microsecond=0)}}},
+            {"$group": {"_id": "$tracker", "analyses": {"$sum": "$count"}}}
+        ]
+        collection = db.tracker_daily_rollups
+    else:
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": since}, "third_party_domains.0": {"$exists": True}, **ANALYSIS_RECORDS_ONLY}},
+            {"$unwind": "$third_party_domains"},
+            {"$group": {"_id": "$third_party_domains", "analyses": {"$sum": 1}}}
+        ]
+        collection = db.analysis_logs
+    pipeline += [{"$sort": {"analyses": -1, "_id": 1}}, {"$limit": limit}]
+    rows = await collection.aggregate(pipeline).to_list(limit)
+    
+    return {
+        "days": days,
+        "source": source,
+        "trackers": [{"tracker": row["_id"], "analyses": row["analyses"]} for row in rows]
+    }
+
+@api_router.get("/analytics/counts")
+async def analysis_counts(
+    days: int = Query(7, ge=1, le=3660),
+    bucket: AnalyticsBucket = 'day',
+    source: AnalyticsSource = 'raw'
+):
+    """Number of analyses per time bucket, split by threat level"""
+    since = datetime.utcnow() - timedelta(days=days)
+    
+    if source == 'rollup':
+        _require_rollup_bucket(bucket)
+        pipeline = [
+            {"$match": {"day": {"$gte": since.replace(hour=0, minute=0, second=0, microsecond=0)}}},
+            {"$group": {
+                "_id": _bucket_expression("day", bucket),
+                **{level: {"$sum": {"$ifNull": [f"$threat_levels.{level}", 0]}} for level in THREAT_LEVELS},
+                "total": {"$sum": "$total"},
+                "cookies_found": {"$sum": "$cookies_found"},
+                "third_parties": {"$sum": "$third_parties"}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        rows = await db.analysis_daily_rollups.aggregate(pipeline).to_list(None)
+    else:
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": since}, **ANALYSIS_RECORDS_ONLY}},
+            {"$group": {
+                "_id": _bucket_expression("timestamp", bucket),
+                **{level: {"$sum": {"$cond": [{"$eq": ["$threat_level", level]}, 1, 0]}} for level in THREAT_LEVELS},
+                "total": {"$sum": 1},
+                "cookies_found": {"$sum": "$cookies_found"},
+                "third_parties": {"$sum": "$third_parties"}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        rows = await db.analysis_logs.aggregate(pipeline).to_list(None)
+    
+    return {
+        "bucket": bucket,
+        "source": source,
+        "counts": [{"bucket": row.pop("_id"), **row} for row in rows]
+    }
+
+# Backfill of analytics fields on records logged before they existed
+async def backfill_analysis_logs(batch_size: int = ANALYTICS_BACKFILL_BATCH_SIZE) -> int:
+    """Add base_domain and third_party_domains to older analysis_logs records, returning how many were updated.
+
+    base_domain is derived from domain. Tracker names were not logged, so they
+    are taken from the matching analysis_results document, or left empty when
+    there is none. Each updated record is folded into the rollups once: the
+    update only applies while base_domain is still missing.
+    """
+    updated = 0
+    query = {"base_domain": {"$exists": False}, "domain": {"$type": "string"}, **ANALYSIS_RECORDS_ONLY}
+    while True:
+        records = await db.analysis_logs.find(query).sort("timestamp", 1).to_list(batch_size)
+        if not records:
+            break
+        for record in records:
+            fields = {"base_domain": privacy_analyzer.public_suffixes.registrable_domain(_hostname(record["domain"]))}
+            if record.get("third_party_domains") is None:
+                fields["third_party_domains"] = await _stored_third_parties(record)
+            result = await db.analysis_logs.update_one(
+                {"_id": record["_id"], "base_domain": {"$exists": False}}, {"$set": fields}
+            )
+            if result.modified_count:
+                updated += 1
+                if isinstance(record.get("timestamp"), datetime) and record.get("threat_level"):
+                    await record_analysis_rollups({**record, **fields})
+    if updated:
+        logger.info(f"Backfilled analytics fields on {updated} analysis_logs records")
+    return updated
+
+async def _stored_third_parties(record: Dict[str, Any]) -> List[str]:
+    """Tracker domains of the analysis_results document stored alongside an analysis_logs record"""
+    timestamp = record.get("timestamp")
+    if not isinstance(timestamp, datetime):
+        return []
+    window = timedelta(seconds=ANALYTICS_BACKFILL_MATCH_SECONDS)
+    stored = await db.analysis_results.find_one(
+        {
+            "domain": record["domain"],
+            "analysisTimestamp": {"$gte": (timestamp - window).isoformat(), "$lte": (timestamp + window).isoformat()}
+        },
+        {"thirdParties.domain": 1}
+    )
+    if stored is None:
+        return []
+    return [party["domain"] for party in stored.get("thirdParties", []) if party.get("domain")]
+
+# Bulk re-scoring of stored analyses with vectorized threat rules
+class ThreatScores(NamedTuple):
+    levels: np.ndarray
+    total: np.ndarray
+    known_platform: np.ndarray
+    personal: np.ndarray
+
+def score_threats(
+    domains: np.ndarray,
+    cookies: np.ndarray,
+    fingerprinting: np.ndarray,
+    third_parties: np.ndarray,
+    platform_trackers: np.ndarray,
+    thresholds: ThreatThresholds
+) -> ThreatScores:
+    """Column-wise equivalent of PrivacyAnalyzer._calculate_threat_level's decisions.
+
+    Domain lookups run once per distinct domain and are broadcast back, so the
+    per-record work is plain array arithmetic.
+    """
+    unique_domains, inverse = np.unique(domains, return_inverse=True)
+    index = privacy_analyzer.reputation_index
+    known_platform = np.array([index.lookup(_hostname(domain)) is not None for domain in unique_domains], dtype=bool)[inverse]
+    platform_domain = np.array([any(keyword in domain.lower() for keyword in PLATFORM_DOMAIN_KEYWORDS)
+                                for domain in unique_domains], dtype=bool)[inverse]
+    
+    total = cookies + fingerprinting + third_parties
+    levels = np.where(known_platform | (total >= thresholds.high), "HIGH",
+                      np.where(total >= thresholds.medium, "MEDIUM", "LOW"))
+    
+    personal_indicators = (
+        (cookies <= thresholds.personalMaxCookies).astype(np.int8)
+        + (third_parties <= thresholds.personalMaxThirdParties)
+        + ~platform_domain
+        + ~platform_trackers
+    )
+    personal = (personal_indicators >= thresholds.personalMinIndicators) & (total <= thresholds.personalMaxTracking)
+    return ThreatScores(np.where(personal, "LOW", levels), total, known_platform, personal)
+
+def score_threat_levels(
+    domains: np.ndarray,
+    cookies: np.ndarray,
+    fingerprinting: np.ndarray,
+    third_parties: np.ndarray,
+    platform_trackers: np.ndarray,
+    thresholds: ThreatThresholds
+) -> np.ndarray:
+    """Threat levels alone, for callers that do not need the other columns"""
+    return score_threats(domains, cookies, fingerprinting, third_parties, platform_trackers, thresholds).levels
+
+# Per-collection projection onto the scoring columns, and the stored fields derived from the score
+RESCORE_SOURCES = {
+    'analysis_logs': {
+        "fields": {"level": "threat_level", "high_threat": "is_high_threat_domain"},
+        "match": ANALYSIS_RECORDS_ONLY,
+        "project": {
+            "domain": "$domain",
+            "level": "$threat_level",
+            "high_threat": "$is_high_threat_domain",
+            "cookies": "$cookies_found",
+            "fingerprinting": "$fingerprinting_methods",
+            "third_parties": "$third_parties",
+            "trackers": {"$ifNull": ["$third_party_domains", []]},
+            "timestamp": "$timestamp",
+            "base_domain": "$base_domain"
+        }
+    },
+    'analysis_results': {
+        "fields": {"level": "threatLevel", "description": "threatDescription"},
+        "match": {},
+        "project": {
+            "domain": "$domain",
+            "level": "$threatLevel",
+            "description": "$threatDescription",
+            "cookies": "$cookieCount",
+            "fingerprinting": {"$size": {"$ifNull": ["$fingerprinting", []]}},
+            "third_parties": {"$size": {"$ifNull": ["$thirdParties", []]}},
+            "trackers": {"$ifNull": ["$thirdParties.domain", []]}
+        }
+    }
+}
+
+async def rescore_collection(name: str, thresholds: ThreatThresholds, since: Optional[datetime], dry_run: bool) -> Dict[str, Any]:
+    """Re-apply the threat rules to one collection in batches, writing back only changed records"""
+    source = RESCORE_SOURCES[name]
+    match = dict(source["match"])
+    if since is not None:
+        match["timestamp" if name == 'analysis_logs' else "analysisTimestamp"] = (
+            {"$gte": since} if name == 'analysis_logs' else {"$gte": since.isoformat()}
+        )
+    cursor = db[name].aggregate([{"$match": match}, {"$project": source["project"]}], batchSize=RESCORE_BATCH_SIZE)
+    summary = {"scanned": 0, "changed": 0, "fields": list(source["fields"].values()),
+               "levels": {level: 0 for level in THREAT_LEVELS}}
+    
+    batch = []
+    async for row in cursor:
+        batch.append(row)
+        if len(batch) >= RESCORE_BATCH_SIZE:
+            await _rescore_batch(name, batch, thresholds, dry_run, summary)
+            batch = []
+    if batch:
+        await _rescore_batch(name, batch, thresholds, dry_run, summary)
+    return summary
+
+async def _rescore_batch(name: str, rows: List[Dict[str, Any]], thresholds: ThreatThresholds, dry_run: bool, summary: Dict[str, Any]):
+    platform_trackers = set(PLATFORM_TRACKER_DOMAINS)
+    fields = RESCORE_SOURCES[name]["fields"]
+    with timed_stage('rescore'):
+        scores = score_threats(
+            np.array([row.get("domain") or '' for row in rows], dtype=object),
+            np.fromiter((row.get("cookies") or 0 for row in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((row.get("fingerprinting") or 0 for row in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((row.get("third_parties") or 0 for row in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((any(tracker.lower() in platform_trackers for tracker in row["trackers"]) for row in rows),
+                        dtype=bool, count=len(rows)),
+            thresholds
+        )
+        levels = scores.levels
+        # Everything the live scorer derives from the level is rewritten with it
+        columns = {"level": levels}
+        if "high_threat" in fields:
+            columns["high_threat"] = (levels == "HIGH") & scores.known_platform & ~scores.personal
+        if "description" in fields:
+            columns["description"] = np.array([
+                describe_threat(str(level), int(total), bool(personal),
+                                PUBLIC_SUFFIXES.registrable_domain(_hostname(row.get("domain") or '')) if platform else None)
+                for row, level, total, platform, personal
+                in zip(rows, levels, scores.total, scores.known_platform, scores.personal)
+            ], dtype=object)
+        previous = {column: np.array([row.get(column) for row in rows], dtype=object) for column in columns}
+        level_changed = levels != previous["level"]
+        changed = np.flatnonzero(np.logical_or.reduce([values != previous[column] for column, values in columns.items()]))
+    
+    summary["scanned"] += len(rows)
+    summary["changed"] += len(changed)
+    for level, count in zip(*np.unique(levels, return_counts=True)):
+        summary["levels"][str(level)] = summary["levels"].get(str(level), 0) + int(count)
+    if dry_run or not len(changed):
+        return
+    
+    # Records getting the same values share one UpdateMany, keeping the write-back to a handful of operations
+    values = {column: column_values.tolist() for column, column_values in columns.items()}
+    groups: Dict[tuple, List[Any]] = {}
+    for position in changed:
+        key = tuple((fields[column], values[column][position]) for column in columns)
+        groups.setdefault(key, []).append(rows[position]["_id"])
+    operations = [UpdateMany({"_id": {"$in": ids}}, {"$set": dict(key)}) for key, ids in groups.items()]
+    with timed_stage('persist'):
+        await db[name].bulk_write(operations, ordered=False)
+    
+    # Move the changed analyses between threat-level counters in the daily rollups
+    if name == 'analysis_logs' and ANALYTICS_ROLLUPS_ENABLED:
+        moves: Dict[tuple, int] = {}
+        for position in np.flatnonzero(level_changed):
+            row = rows[position]
+            if row.get("timestamp") is None or row.get("base_domain") is None:
+                continue
+            key = (f"{row['timestamp'].strftime('%Y-%m-%d')}:{row['base_domain']}", row["level"], str(levels[position]))
+            moves[key] = moves.get(key, 0) + 1
+        for (rollup_id, old_level, new_level), count in moves.items():
+            increments = {f"threat_levels.{new_level}": count}
+            if old_level:
+                increments[f"threat_levels.{old_level}"] = -count
+            await mongo_writer.enqueue_update('analysis_daily_rollups', {"_id": rollup_id}, {"$inc": increments})
+
+@api_router.post("/admin/rescore", dependencies=[Depends(require_admin)])
+async def rescore_stored_analyses(request: RescoreRequest):
+    """Recompute threat levels of stored analyses under the given (or live) thresholds
+
+    Custom thresholds only reach new analyses with applyLive; otherwise stored
+    records and live scoring disagree until THREAT_THRESHOLDS is updated.
+    """
+    live_thresholds = privacy_analyzer.thresholds
+    thresholds = request.thresholds or live_thresholds
+    since = datetime.utcnow() - timedelta(days=request.days) if request.days else None
+    started = time.perf_counter()
+    results = {}
+    for name in dict.fromkeys(request.collections):
+        results[name] = await rescore_collection(name, thresholds, since, request.dryRun)
+    applied = request.applyLive and not request.dryRun and thresholds != live_thresholds
+    if applied:
+        privacy_analyzer.thresholds = thresholds
+        # Cached responses were scored under the previous live thresholds
+        analysis_cache.clear()
+    return {
+        "thresholds": thresholds.dict(),
+        "dryRun": request.dryRun,
+        "appliedLive": applied,
+        "collections": results,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+async def ensure_indexes():
+    """Create the indexes that back paginated and filtered queries"""
+    try:
+        await db.status_checks.create_index([('timestamp', -1), ('id', -1)])
+        await db.status_checks.create_index([('client_name', 1), ('timestamp', -1), ('id', -1)])
+        await db.analysis_logs.create_index([('timestamp', 1)])
+        await db.analysis_logs.create_index([('base_domain', 1), ('timestamp', 1), ('threat_level', 1)])
+        await db.analysis_logs.create_index([('timestamp', 1), ('third_party_domains', 1)])
+        await db.analysis_daily_rollups.create_index([('domain', 1), ('day', 1)])
+        await db.analysis_daily_rollups.create_index([('day', 1)])
+        await db.tracker_daily_rollups.create_index([('day', 1), ('tracker', 1)])
+        await db.analysis_jobs.create_index([('status', 1), ('createdAt', 1)])
+        await db.watchlist.create_index([('nextRunAt', 1)])
+    except Exception as e:
+        logger.warning(f"Index creation failed: {e}")
 
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    WRITE_QUEUE_DEPTH.set(mongo_writer.pending)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware adding a Server-Timing header with the stage durations
+
+    The header goes out with the response start, so it covers the stages that
+    ran before the first byte; work done while streaming a body is not in it.
+    Only registered when SERVER_TIMING_ENABLED, so other deployments pay nothing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timings(message):
+            if message["type"] == "http.response.start":
+                timings['total'] = time.perf_counter() - started
+                header = ', '.join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items())
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _request_timings.reset(token)
+
+if SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -724,13 +3671,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+@app.on_event("startup")
+async def startup_http_client():
+    await privacy_analyzer.start()
+
+@app.on_event("startup")
+async def startup_scan_offloader():
+    scan_offloader.start(privacy_analyzer.matcher)
+
+@app.on_event("startup")
+async def startup_write_buffer():
+    mongo_writer.start()
+
+@app.on_event("startup")
+async def startup_indexes():
+    await ensure_indexes()
+
+@app.on_event("startup")
+async def startup_analytics_backfill():
+    # Runs in the background; records it has not reached yet are simply missing from the analytics views
+    app.state.analytics_backfill = asyncio.create_task(_run_analytics_backfill())
+
+async def _run_analytics_backfill():
+    try:
+        await backfill_analysis_logs()
+    except Exception as e:
+        logger.warning(f"Analytics backfill stopped: {e}")
+
+@app.on_event("startup")
+async def startup_job_workers():
+    await analysis_jobs.start()
+
+@app.on_event("startup")
+async def startup_watchlist_scheduler():
+    if WATCHLIST_ENABLED:
+        watchlist_scheduler.start()
+
+@app.on_event("startup")
+async def startup_tracker_reloader():
+    tracker_reloader.start()
+
+@app.on_event("shutdown")
+async def shutdown_job_workers():
+    backfill = getattr(app.state, 'analytics_backfill', None)
+    if backfill is not None:
+        backfill.cancel()
+    await analysis_jobs.stop()
+    await watchlist_scheduler.stop()
+    await tracker_reloader.stop()
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await privacy_analyzer.close()
+    await scan_offloader.stop()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Drain buffered analysis logs before the connection goes away
+    await mongo_writer.stop()
     client.close()
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Euridice - Digital Spellbook for Algorithmic Resistance
+Measures throughput and latency of the backend without touching the network or a real database.
+
+The FastAPI app runs in-process under uvicorn, analyses target a local aiohttp site serving
+synthetic tracker-laden pages, and MongoDB is replaced by an in-memory stand-in.
+
+    python backend_benchmark.py --requests 500 --concurrency 32
+    python backend_benchmark.py --output bench_output.txt
+    python backend_benchmark.py --baseline bench_output.txt --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import socket
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import aiohttp  # noqa: E402
+import uvicorn  # noqa: E402
+from aiohttp import web  # noqa: E402
+from pymongo import UpdateOne  # noqa: E402
+
+import server  # noqa: E402
+
+
+# In-memory MongoDB stand-in
+def _get_path(document: Dict[str, Any], path: str):
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, branch) for branch in condition):
+                return False
+            continue
+        value = _get_path(document, key)
+        if isinstance(condition, dict) and any(op.startswith("$") for op in condition):
+            for op, operand in condition.items():
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+                if op == "$lte" and not (value is not None and value <= operand):
+                    return False
+                if op == "$gt" and not (value is not None and value > operand):
+                    return False
+                if op == "$gte" and not (value is not None and value >= operand):
+                    return False
+                if op == "$exists" and (value is not None) != bool(operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class InMemoryCursor:
+    def __init__(self, documents: List[Dict[str, Any]], projection: Optional[Dict[str, Any]]):
+        self.documents = documents
+        self.projection = projection
+        self._limit = 0
+
+    def sort(self, keys, direction: Optional[int] = None):
+        if isinstance(keys, str):
+            keys = [(keys, direction or 1)]
+        for field, direction in reversed(keys):
+            self.documents.sort(key=lambda document: _get_path(document, field), reverse=direction < 0)
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    async def to_list(self, length: Optional[int]):
+        count = min(filter(None, [self._limit, length]), default=len(self.documents))
+        return [self._project(document) for document in self.documents[:count]]
+
+    def _project(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.projection:
+            return dict(document)
+        included = [field for field, flag in self.projection.items() if flag and field != "_id"]
+        projected = {field: document[field] for field in included if field in document}
+        if self.projection.get("_id", 1) and "_id" in document:
+            projected["_id"] = document["_id"]
+        return projected
+
+
+class InMemoryCollection:
+    def __init__(self):
+        self.documents: List[Dict[str, Any]] = []
+        self.by_id: Dict[Any, Dict[str, Any]] = {}
+
+    async def insert_one(self, document: Dict[str, Any]):
+        self._insert(document)
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True):
+        for document in documents:
+            self._insert(document)
+
+    async def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        self._update(filter, update, upsert)
+
+    async def bulk_write(self, operations: List[UpdateOne], ordered: bool = True):
+        for operation in operations:
+            self._update(operation._filter, operation._doc, operation._upsert)
+
+    async def create_index(self, keys, **kwargs):
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+        return InMemoryCursor([d for d in self.documents if _matches(d, query or {})], projection)
+
+    def _insert(self, document: Dict[str, Any]):
+        document.setdefault("_id", len(self.documents) + 1)
+        self.documents.append(document)
+        self.by_id[document["_id"]] = document
+
+    def _update(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool):
+        document = next((d for d in self.documents if _matches(d, filter)), None)
+        if document is None:
+            if not upsert:
+                return
+            document = dict(filter)
+            document.update(update.get("$setOnInsert", {}))
+            self._insert(document)
+        for path, amount in update.get("$inc", {}).items():
+            *parents, leaf = path.split(".")
+            target = document
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = target.get(leaf, 0) + amount
+        for path, value in update.get("$set", {}).items():
+            document[path] = value
+
+
+class InMemoryDatabase:
+    def __init__(self):
+        self.collections: Dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        return self.collections.setdefault(name, InMemoryCollection())
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+# Synthetic target site
+TRACKER_SNIPPETS = [
+    "<script async src='https://www.googletagmanager.com/gtag/js?id=G-{n}'></script>",
+    "<script src='https://www.google-analytics.com/analytics.js'></script>",
+    "<script>!function(f){{f.fbq('init','{n}')}}(window);// connect.facebook.com</script>",
+    "<img src='https://ad.doubleclick.net/pixel?id={n}' width='1' height='1'>",
+    "<script src='https://static.hotjar.com/c/hotjar-{n}.js'></script>",
+    "<script src='https://cdn.mxpnl.com/libs/mixpanel.js'></script><!-- mixpanel.com -->",
+    "<script>var c=document.createElement('canvas');c.getContext('webgl');new AudioContext();</script>",
+    "<script>navigator.getBattery().then(function(b){{}});new RTCPeerConnection(); /* webrtc */</script>",
+]
+
+
+def build_synthetic_page(size_kb: int, seed: int = 0) -> str:
+    """HTML page of roughly size_kb kilobytes with trackers spread through filler prose"""
+    rng = random.Random(seed)
+    filler = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</p>\n"
+    parts = ["<!doctype html><html><head><title>Synthetic</title>"]
+    size = 0
+    while size < size_kb * 1024:
+        chunk = rng.choice(TRACKER_SNIPPETS).format(n=rng.randint(1000, 9999)) if rng.random() < 0.05 else filler
+        parts.append(chunk)
+        size += len(chunk)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+async def start_target_site(page_kb: int) -> tuple:
+    page = build_synthetic_page(page_kb)
+
+    async def handle_page(request: web.Request) -> web.Response:
+        response = web.Response(text=page, content_type="text/html")
+        response.set_cookie("_ga", f"GA1.2.{random.randint(1, 10**9)}", max_age=63072000)
+        response.set_cookie("_fbp", f"fb.1.{random.randint(1, 10**9)}", max_age=7776000)
+        response.set_cookie("session", "opaque")
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle_page)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(percentile / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class EuridiceBenchmark:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.results: Dict[str, Any] = {"load": {}, "micro": {}, "allocations": {}}
+
+    async def run_load(self):
+        database = InMemoryDatabase()
+        server.db = database
+        server.mongo_writer.database = database
+        if self.args.no_cache:
+            server.analysis_cache.max_entries = 0
+
+        site_runner, site_url = await start_target_site(self.args.page_kb)
+        port = _free_port()
+        config = uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+        app_server = uvicorn.Server(config)
+        app_server.install_signal_handlers = lambda: None
+        serve_task = asyncio.create_task(app_server.serve())
+        while not app_server.started:
+            await asyncio.sleep(0.01)
+
+        base_url = f"http://127.0.0.1:{port}/api"
+        try:
+            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.args.concurrency)) as session:
+                scenarios = {
+                    "analyze": lambda i: session.post(f"{base_url}/analyze", json={
+                        "url": f"{site_url}/page/{i % self.args.distinct_urls}",
+                        # The page references real tracker scripts; crawling them would leave the machine
+                        "options": {"includeWebScraping": True, "includeExternalScripts": False}
+                    }),
+                    "poison": lambda i: session.post(f"{base_url}/poison", json={
+                        "url": f"{site_url}/", "domain": "127.0.0.1", "targetCookies": ["_ga", "_fbp"]
+                    }),
+                    "status": lambda i: session.post(f"{base_url}/status", json={"client_name": f"bench-{i % 8}"})
+                    if i % 2 else session.get(f"{base_url}/status", params={"limit": 50}),
+                }
+                for name in self.args.scenarios:
+                    self.results["load"][name] = await self._drive(name, scenarios[name])
+        finally:
+            app_server.should_exit = True
+            await serve_task
+            await site_runner.cleanup()
+
+    async def _drive(self, name: str, make_request) -> Dict[str, Any]:
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        latencies: List[float] = []
+        errors = 0
+
+        async def one(index: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                async with make_request(index) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(self.args.requests)))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        summary = {
+            "requests": self.args.requests,
+            "errors": errors,
+            "rps": round(self.args.requests / elapsed, 1),
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+        }
+        print(f"📈 {name:<8} {summary['rps']:>9.1f} req/s  p50 {summary['p50_ms']:>8.2f} ms  "
+              f"p95 {summary['p95_ms']:>8.2f} ms  p99 {summary['p99_ms']:>8.2f} ms  "
+              f"errors {errors}  peak RSS {summary['peak_rss_mb']:.1f} MB")
+        return summary
+
+    def run_micro(self):
+        analyzer = server.privacy_analyzer
+        page = build_synthetic_page(self.args.page_kb)
+        fingerprinting = analyzer._analyze_fingerprinting(page)
+        third_parties = analyzer._analyze_third_parties(page)
+        cookies = analyzer._parse_cookies(["_ga=GA1.2.1; Max-Age=63072000", "_fbp=fb.1.1; Path=/", "sid=x"], "bench.test")
+
+        # Clearing the content-hash scan cache first measures a real scan of the page
+        benchmarks = {
+            "_analyze_fingerprinting": lambda: (server.scan_results.clear(), analyzer._analyze_fingerprinting(page)),
+            "_analyze_third_parties": lambda: (server.scan_results.clear(), analyzer._analyze_third_parties(page)),
+            "_analyze_fingerprinting (cached)": lambda: analyzer._analyze_fingerprinting(page),
+            "_calculate_threat_level": lambda: analyzer._calculate_threat_level(
+                cookies, fingerprinting, third_parties, "www.bench.co.uk"),
+        }
+        for name, benchmark in benchmarks.items():
+            self.results["micro"][name] = self._time(name, benchmark)
+
+    def run_allocations(self):
+        """CPU time and memory per analysis for the detector pipeline, from scan hits to response models"""
+        analyzer = server.privacy_analyzer
+        scan = analyzer._scan_text(build_synthetic_page(self.args.page_kb))
+        cookie_headers = ["_ga=GA1.2.1; Max-Age=63072000", "_fbp=fb.1.1; Path=/", "_gid=GA1.2.2; Expires=Wed",
+                          "track_id=7; Path=/", "sid=x"]
+        domain = "www.bench.co.uk"
+
+        def pipeline():
+            cookies = analyzer._parse_cookies(cookie_headers, domain)
+            fingerprinting = analyzer._fingerprinting_from_hits(scan["matches"])
+            third_parties = analyzer._third_parties_from_hosts(scan["hosts"])
+            threat = analyzer._calculate_threat_level(cookies, fingerprinting, third_parties, domain)
+            return threat, analyzer._response_findings(cookies, fingerprinting, third_parties)
+
+        for _ in range(100):
+            pipeline()
+        iterations = self.args.micro_iterations * 20
+        started = time.process_time()
+        for _ in range(iterations):
+            pipeline()
+        cpu_us = (time.process_time() - started) / iterations * 1e6
+
+        # Retained memory is what an analysis keeps alive; peak includes its temporaries
+        samples = 100
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            kept = [pipeline() for _ in range(samples)]
+            after = tracemalloc.take_snapshot()
+            growth = [stat for stat in after.compare_to(before, "filename") if stat.size_diff > 0]
+            retained_bytes = sum(stat.size_diff for stat in growth) / len(kept)
+            retained_blocks = sum(stat.count_diff for stat in growth) / len(kept)
+            peaks = []
+            for _ in range(samples):
+                tracemalloc.reset_peak()
+                current = tracemalloc.get_traced_memory()[0]
+                pipeline()
+                peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+
+        summary = {
+            "iterations": iterations,
+            "cpu_us": round(cpu_us, 1),
+            "retained_bytes": round(retained_bytes),
+            "retained_blocks": round(retained_blocks),
+            "peak_bytes": max(peaks),
+        }
+        self.results["allocations"]["detector_pipeline"] = summary
+        print(f"🧮 detector pipeline  cpu {summary['cpu_us']:>8.1f} µs/analysis  retained {summary['retained_bytes']:>7} B "
+              f"({summary['retained_blocks']} blocks)  peak {summary['peak_bytes']:>7} B")
+
+    def _time(self, name: str, benchmark) -> Dict[str, Any]:
+        benchmark()
+        iterations = self.args.micro_iterations
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            benchmark()
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        summary = {
+            "iterations": iterations,
+            "mean_us": round(sum(samples) / iterations * 1e6, 1),
+            "p50_us": round(_percentile(samples, 50) * 1e6, 1),
+            "p95_us": round(_percentile(samples, 95) * 1e6, 1),
+        }
+        print(f"🔬 {name:<26} mean {summary['mean_us']:>11.1f} µs  p50 {summary['p50_us']:>11.1f} µs  "
+              f"p95 {summary['p95_us']:>11.1f} µs")
+        return summary
+
+    def compare(self, baseline: Dict[str, Any]) -> List[str]:
+        """Metrics that got worse than baseline by more than the tolerance"""
+        tolerance = self.args.tolerance
+        regressions = []
+        for name, current in self.results["load"].items():
+            previous = baseline.get("load", {}).get(name)
+            if previous and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{name} p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+            if previous and current["rps"] < previous["rps"] * (1 - tolerance):
+                regressions.append(f"{name} throughput {previous['rps']} -> {current['rps']} req/s")
+        for name, current in self.results["micro"].items():
+            previous = baseline.get("micro", {}).get(name)
+            if previous and current["p50_us"] > previous["p50_us"] * (1 + tolerance):
+                regressions.append(f"{name} p50 {previous['p50_us']} µs -> {current['p50_us']} µs")
+        for name, current in self.results["allocations"].items():
+            previous = baseline.get("allocations", {}).get(name)
+            if previous and current["cpu_us"] > previous["cpu_us"] * (1 + tolerance):
+                regressions.append(f"{name} cpu {previous['cpu_us']} µs -> {current['cpu_us']} µs")
+            if previous and current["retained_bytes"] > previous["retained_bytes"] * (1 + tolerance):
+                regressions.append(f"{name} retained {previous['retained_bytes']} B -> {current['retained_bytes']} B")
+        return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Euridice backend benchmark suite")
+    parser.add_argument("--requests", type=int, default=300, help="requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent client requests")
+    parser.add_argument("--scenarios", nargs="+", default=["analyze", "poison", "status"],
+                        choices=["analyze", "poison", "status"])
+    parser.add_argument("--distinct-urls", type=int, default=10**9,
+                        help="distinct target URLs for /api/analyze (lower it to exercise the result cache)")
+    parser.add_argument("--no-cache", action="store_true", help="disable the analysis result cache")
+    parser.add_argument("--page-kb", type=int, default=256, help="size of the synthetic target page")
+    parser.add_argument("--micro-iterations", type=int, default=50, help="iterations per microbenchmark")
+    parser.add_argument("--skip-load", action="store_true", help="only run the microbenchmarks")
+    parser.add_argument("--skip-micro", action="store_true", help="only run the load scenarios")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown versus baseline (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    """Main benchmarking function"""
+    args = parse_args()
+    benchmark = EuridiceBenchmark(args)
+
+    print("⏱️  Starting Euridice Backend Benchmark Suite")
+    print("=" * 70)
+    if not args.skip_micro:
+        benchmark.run_micro()
+        benchmark.run_allocations()
+    if not args.skip_load:
+        asyncio.run(benchmark.run_load())
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(benchmark.results, indent=2))
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        regressions = benchmark.compare(json.loads(Path(args.baseline).read_text()))
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions beyond {args.tolerance:.0%} tolerance:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend is a single module run from its own directory (uvicorn server:app)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """In-memory MongoDB standing in for the server's database"""
+    from mongomock_motor import AsyncMongoMockClient
+
+    import server
+
+    database = AsyncMongoMockClient()['euridice_test']
+    monkeypatch.setattr(server, 'db', database)
+    monkeypatch.setattr(server.mongo_writer, 'database', database)
+    return database
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeResult:
+    def __init__(self, url):
+        self.url = url
+
+    def dict(self):
+        return {"url": self.url, "threatLevel": "LOW", "poeticKeyword": "first", "analysisTimestamp": "then"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(server, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def analyses(mongo, monkeypatch):
+    """Counts the analyses that actually ran behind a fresh cache"""
+    calls = []
+
+    async def analyze_website(url, options):
+        calls.append(url)
+        return FakeResult(url)
+
+    monkeypatch.setattr(server, 'analysis_cache', server.TTLCache(10, 60))
+    monkeypatch.setattr(server, 'failed_analyses', server.TTLCache(10, 60))
+    monkeypatch.setattr(server.privacy_analyzer, 'analyze_website', analyze_website)
+    return calls
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = server.TTLCache(10, 30)
+    cache.set("key", "value")
+    clock.now += 29
+    assert cache.get("key") == ("value", 29)
+    clock.now += 1
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = server.TTLCache(2, 30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_equivalent_urls_share_a_cache_key():
+    options = server.AnalysisOptions()
+    assert (server.analysis_cache_key("HTTPS://Example.COM:443/#top", options)
+            == server.analysis_cache_key("https://example.com/", options))
+    assert (server.analysis_cache_key("https://example.com:8443/", options)
+            != server.analysis_cache_key("https://example.com/", options))
+
+
+def test_repeat_analysis_is_served_from_cache(analyses):
+    async def scenario():
+        options = server.AnalysisOptions()
+        first = await server._cached_analysis("https://example.com", options)
+        second = await server._cached_analysis("https://EXAMPLE.com/", options)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert analyses == ["https://example.com"]
+    assert first["cache"]["hit"] is False
+    assert second["cache"]["hit"] is True
+    assert second["threatLevel"] == "LOW"
+    assert second["analysisTimestamp"] != "then"
+
+
+def test_scan_results_survive_in_the_disk_tier(tmp_path):
+    matcher = server.PatternMatcher(["canvas", "webgl"])
+    key = server.ScanResultCache.key(matcher, b"<script>canvas</script>")
+    assert key != server.ScanResultCache.key(matcher, b"<script>webgl</script>")
+    result = {"matches": {"canvas": 1}, "hosts": {"www.google-analytics.com": 2}, "resources": [], "pixels": []}
+
+    asyncio.run(server.ScanResultCache(10, 'disk', tmp_path).set(key, result))
+    restarted = server.ScanResultCache(10, 'disk', tmp_path)
+    assert asyncio.run(restarted.get(key)) == result
+    assert len(restarted) == 1
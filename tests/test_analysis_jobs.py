@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import server
+
+
+def job(job_id, status, **fields):
+    return {"_id": job_id, "status": status, "url": f"https://{job_id}.example/", "options": {},
+            "createdAt": datetime.utcnow(), **fields}
+
+
+def test_each_claimable_job_runs_once_across_instances(mongo):
+    runs = []
+
+    async def run(url, options):
+        runs.append(url)
+        await asyncio.sleep(0.2)  # longer than the lease, so renewals matter
+        return {"url": url}
+
+    async def scenario():
+        now = datetime.utcnow()
+        await mongo.jobs.insert_many([
+            job("queued", "queued"),
+            job("expired", "running", leaseUntil=now - timedelta(seconds=5)),
+            job("legacy", "running"),
+            job("leased", "running", owner="elsewhere", leaseUntil=now + timedelta(hours=1)),
+            job("done", "succeeded"),
+        ])
+        queues = [server.AnalysisJobQueue('jobs', 2, 100, run, lease_seconds=0.1) for _ in range(2)]
+        for queue in queues:
+            await queue.start()
+        await asyncio.sleep(0.6)
+        for queue in queues:
+            await queue.stop()
+        return {document["_id"]: document["status"] async for document in mongo.jobs.find({})}
+
+    statuses = asyncio.run(scenario())
+    assert sorted(runs) == ["https://expired.example/", "https://legacy.example/", "https://queued.example/"]
+    assert statuses == {"queued": "succeeded", "expired": "succeeded", "legacy": "succeeded",
+                        "leased": "running", "done": "succeeded"}
+
+
+def test_claim_is_atomic(mongo):
+    async def scenario():
+        await mongo.jobs.insert_one(job("one", "queued"))
+        first = server.AnalysisJobQueue('jobs', 1, 10, None)
+        second = server.AnalysisJobQueue('jobs', 1, 10, None)
+        return await first._claim("one"), await second._claim("one")
+
+    claimed, rejected = asyncio.run(scenario())
+    assert claimed["status"] == "running" and claimed["leaseUntil"] > datetime.utcnow()
+    assert rejected is None
+
+
+class FlakyJobs:
+    """update_one replies in turn: an exception is raised, a number is the matched count"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+
+    async def update_one(self, query, update):
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(matched_count=reply)
+
+
+def test_heartbeat_survives_errors_and_cancels_run_when_lease_is_lost(monkeypatch):
+    jobs = FlakyJobs([RuntimeError("primary stepped down"), 1, 0])
+    monkeypatch.setattr(server.AnalysisJobQueue, 'collection', property(lambda self: jobs))
+
+    async def scenario():
+        queue = server.AnalysisJobQueue('jobs', 1, 10, None, lease_seconds=0.03)
+        running = asyncio.ensure_future(asyncio.sleep(10))
+        lost = await asyncio.wait_for(queue._renew_lease("one", running), 1)
+        await asyncio.sleep(0)
+        return lost, running.cancelled()
+
+    assert asyncio.run(scenario()) == (True, True)
+    assert jobs.replies == []
+
+
+def test_run_is_abandoned_once_another_worker_takes_over(mongo):
+    async def run(url, options):
+        # Another instance takes the job over while this one is still working on it
+        await mongo.jobs.update_one({"_id": "one"}, {"$set": {"owner": "other"}})
+        await asyncio.sleep(1)
+        return {"url": url}
+
+    async def scenario():
+        await mongo.jobs.insert_one(job("one", "queued"))
+        queue = server.AnalysisJobQueue('jobs', 1, 10, run, lease_seconds=0.06)
+        await asyncio.wait_for(queue._run_job("one"), 0.5)
+        return await mongo.jobs.find_one({"_id": "one"})
+
+    document = asyncio.run(scenario())
+    assert document["status"] == "running" and document["owner"] == "other"
+    assert "finishedAt" not in document
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+
+
+def old_log(log_id, domain, timestamp, level="HIGH"):
+    # The shape analysis_logs records had before the analytics fields were added
+    return {"_id": log_id, "url": f"https://{domain}/", "domain": domain, "timestamp": timestamp,
+            "threat_level": level, "cookies_found": 3, "fingerprinting_methods": 1, "third_parties": 2}
+
+
+def test_backfill_derives_fields_and_rollups(mongo):
+    logged_at = datetime.utcnow() - timedelta(days=40)
+
+    async def scenario():
+        await mongo.analysis_logs.insert_many([
+            old_log("with-result", "news.bbc.co.uk", logged_at),
+            old_log("without-result", "www.example.com", logged_at + timedelta(hours=1), "LOW"),
+            {"_id": "diff", "record_type": "rescan_diff", "domain": "example.com", "timestamp": logged_at},
+        ])
+        await mongo.analysis_results.insert_one({
+            "_id": "result", "domain": "news.bbc.co.uk",
+            "analysisTimestamp": (logged_at + timedelta(seconds=1)).isoformat(),
+            "thirdParties": [{"domain": "google-analytics.com"}, {"domain": "doubleclick.net"}],
+        })
+        updated = await server.backfill_analysis_logs(batch_size=1)
+        again = await server.backfill_analysis_logs()
+        logs = {record["_id"]: record async for record in mongo.analysis_logs.find({})}
+        domains = await mongo.analysis_daily_rollups.find({}).to_list(None)
+        trackers = await mongo.tracker_daily_rollups.find({}).to_list(None)
+        top = await server.top_trackers(days=60, limit=10, source='raw')
+        return updated, again, logs, domains, trackers, top
+
+    updated, again, logs, domains, trackers, top = asyncio.run(scenario())
+    assert (updated, again) == (2, 0)
+    assert logs["with-result"]["base_domain"] == "bbc.co.uk"
+    assert logs["with-result"]["third_party_domains"] == ["google-analytics.com", "doubleclick.net"]
+    assert logs["without-result"]["base_domain"] == "example.com"
+    assert logs["without-result"]["third_party_domains"] == []
+    assert "base_domain" not in logs["diff"]
+    assert {(row["domain"], row["total"]) for row in domains} == {("bbc.co.uk", 1), ("example.com", 1)}
+    assert {row["tracker"] for row in trackers} == {"google-analytics.com", "doubleclick.net"}
+    assert {row["tracker"] for row in top["trackers"]} == {"google-analytics.com", "doubleclick.net"}
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    """Stands in for _cached_analysis, recording peak concurrency"""
+    state = {"running": 0, "peak": 0}
+
+    async def cached_analysis(url, options):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        try:
+            await asyncio.sleep(0.01)
+            if "unreachable" in url:
+                raise HTTPException(status_code=422, detail="Could not fetch")
+            if "broken" in url:
+                raise RuntimeError("parser crashed")
+            return {"url": url, "threatLevel": "LOW"}
+        finally:
+            state["running"] -= 1
+
+    monkeypatch.setattr(server, '_cached_analysis', cached_analysis)
+    monkeypatch.setattr(server, 'batch_host_limiter', server.HostLimiter(2))
+    return state
+
+
+def stream(urls, concurrency):
+    async def collect():
+        return [json.loads(line) async for line in server._stream_batch(urls, server.AnalysisOptions(), concurrency)]
+    return asyncio.run(collect())
+
+
+def test_one_line_per_url_then_summary(analyses):
+    urls = ["https://a.example", "https://unreachable.example", "https://broken.example"]
+    lines = stream(urls, 4)
+    results = {line["index"]: line for line in lines[:-1]}
+    assert results[0] == {"index": 0, "url": urls[0], "status": 200, "result": {"url": urls[0], "threatLevel": "LOW"}}
+    assert results[1]["status"] == 422 and results[1]["error"] == "Could not fetch"
+    assert results[2]["status"] == 500
+    assert lines[-1] == {"done": True, "total": 3, "succeeded": 1, "failed": 2}
+
+
+def test_concurrency_is_bounded(analyses):
+    stream([f"https://site{index}.example" for index in range(10)], 3)
+    assert analyses["peak"] == 3
+
+
+def test_same_host_urls_are_limited_per_host(analyses):
+    stream([f"https://one.example/page{index}" for index in range(6)], 6)
+    assert analyses["peak"] == 2
+
+
+def test_oversized_batches_are_rejected(monkeypatch):
+    monkeypatch.setattr(server, 'BATCH_MAX_URLS', 2)
+    request = server.BatchAnalysisRequest(urls=["https://a.example"] * 3)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.analyze_batch(request))
+    assert error.value.status_code == 413
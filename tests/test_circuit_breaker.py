@@ -0,0 +1,85 @@
+import pytest
+
+import server
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(server, 'time', fake)
+    return fake
+
+
+def test_circuit_opens_after_threshold_failures(clock):
+    breaker = server.CircuitBreaker(threshold=3, open_seconds=60, trial_timeout=10, max_hosts=100)
+    for _ in range(2):
+        breaker.record_failure("down.test")
+        assert breaker.check("down.test") is None
+    breaker.record_failure("down.test")
+    assert breaker.check("down.test") == 60
+    clock.now += 45
+    assert breaker.check("down.test") == 15
+
+
+def test_success_resets_failure_count(clock):
+    breaker = server.CircuitBreaker(threshold=2, open_seconds=60, trial_timeout=10, max_hosts=100)
+    breaker.record_failure("flaky.test")
+    breaker.record_success("flaky.test")
+    breaker.record_failure("flaky.test")
+    assert breaker.check("flaky.test") is None
+    assert len(breaker) == 1
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = server.CircuitBreaker(threshold=1, open_seconds=60, trial_timeout=10, max_hosts=100)
+    breaker.record_failure("down.test")
+    clock.now += 60
+    assert breaker.check("down.test") is None       # the trial
+    assert breaker.check("down.test") == 10         # others wait for it
+    breaker.record_success("down.test")
+    assert breaker.check("down.test") is None
+    assert len(breaker) == 0
+
+
+def test_failed_trial_reopens_circuit(clock):
+    breaker = server.CircuitBreaker(threshold=1, open_seconds=60, trial_timeout=10, max_hosts=100)
+    breaker.record_failure("down.test")
+    clock.now += 60
+    assert breaker.check("down.test") is None
+    breaker.record_failure("down.test")
+    assert breaker.check("down.test") == 60
+
+
+def test_abandoned_trial_stops_blocking(clock):
+    breaker = server.CircuitBreaker(threshold=1, open_seconds=60, trial_timeout=10, max_hosts=100)
+    breaker.record_failure("down.test")
+    clock.now += 60
+    assert breaker.check("down.test") is None
+    clock.now += 10
+    assert breaker.check("down.test") is None
+
+
+def test_tracked_hosts_are_bounded(clock):
+    breaker = server.CircuitBreaker(threshold=1, open_seconds=60, trial_timeout=10, max_hosts=2)
+    for host in ("a.test", "b.test", "c.test"):
+        breaker.record_failure(host)
+    assert len(breaker) == 2
+    assert breaker.check("a.test") is None
+
+
+def test_negative_cache_entries_expire(clock):
+    cache = server.TTLCache(max_entries=10, ttl=30)
+    cache.set("https://down.test/", {"message": "no live data"})
+    clock.now += 29
+    assert cache.get("https://down.test/") == ({"message": "no live data"}, 29)
+    clock.now += 1
+    assert cache.get("https://down.test/") is None
+    assert len(cache) == 0
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("value", [
+    "Sun, 06 Nov 1994 08:49:37 GMT",   # IMF-fixdate
+    "Sunday, 06-Nov-94 08:49:37 GMT",  # RFC 850
+    "Sun Nov  6 08:49:37 1994",        # asctime
+    "6 nov 1994 8:49:37",
+])
+def test_parse_cookie_date_accepts_rfc_6265_forms(value):
+    assert server.parse_cookie_date(value) == datetime(1994, 11, 6, 8, 49, 37)
+
+
+@pytest.mark.parametrize("value, year", [("01-Jan-69 00:00:00 GMT", 2069), ("01-Jan-70 00:00:00 GMT", 1970)])
+def test_parse_cookie_date_two_digit_years(value, year):
+    assert server.parse_cookie_date(value).year == year
+
+
+@pytest.mark.parametrize("value", ["", "tomorrow", "Sun, 31 Feb 2030 00:00:00 GMT", "Sun, 06 Nov 1994 25:00:00 GMT"])
+def test_parse_cookie_date_rejects_invalid_dates(value):
+    assert server.parse_cookie_date(value) is None
+
+
+def test_parse_set_cookie_attributes():
+    cookie = server.parse_set_cookie(
+        "_ga=GA1.2.3; Domain=.Example.com; Path=/; Secure; HttpOnly; SameSite=lax; Max-Age=63072000"
+    )
+    assert cookie.name == "_ga"
+    assert cookie.value == "GA1.2.3"
+    assert cookie.domain == "example.com"
+    assert cookie.path == "/"
+    assert cookie.secure and cookie.http_only
+    assert cookie.same_site == "Lax"
+    assert cookie.max_age == 63072000
+
+
+@pytest.mark.parametrize("header", ["no-equals-sign", "=value", "; Path=/"])
+def test_parse_set_cookie_ignores_nameless_cookies(header):
+    assert server.parse_set_cookie(header) is None
+
+
+def test_max_age_beats_expires():
+    now = datetime(2026, 1, 1)
+    cookie = server.parse_set_cookie("id=1; Max-Age=60; Expires=Wed, 01 Jan 2031 00:00:00 GMT")
+    assert cookie.lifetime(now) == 60
+    cookie = server.parse_set_cookie("id=1; Expires=Wed, 01 Jan 2031 00:00:00 GMT; Max-Age=60")
+    assert cookie.lifetime(now) == 60
+
+
+def test_session_cookie_has_no_lifetime():
+    cookie = server.parse_set_cookie("sess=x; Max-Age=soon; Expires=whenever")
+    assert cookie.lifetime(datetime(2026, 1, 1)) is None
+    assert server.describe_cookie_lifetime(None) == "Session"
+
+
+def test_expired_cookies_are_skipped():
+    cookies = server.privacy_analyzer._parse_cookies([
+        "_ga=GA1.2.3; Max-Age=0",
+        "_fbp=fb.1; Expires=Thu, 01 Jan 1970 00:00:00 GMT",
+        "_gid=GA1.2.4; Max-Age=86400",
+    ], "example.com")
+    assert [cookie.name for cookie in cookies] == ["_gid"]
+    assert cookies[0].expiry == "1 day"
+
+
+def test_cookie_rule_table_matching_order():
+    table = server.CookieRuleTable([
+        "# comment line",
+        "_ga analytics Google Analytics",
+        "_ga_* analytics Google Analytics 4",
+        "*hotjar* session-replay Hotjar",
+        "bogus nonsense-category Nobody",
+    ])
+    assert len(table) == 3
+    assert table.classify("_GA")[1] == "Google Analytics - constructs behavioral profiles across digital spaces"
+    assert table.classify("_ga_XYZ")[1].startswith("Google Analytics 4")
+    assert table.classify("my_hotjar_id")[0] == "session recording"
+    assert table.classify("unrelated") is None
@@ -0,0 +1,69 @@
+import pytest
+
+import server
+
+PAGE = """<html><head>
+<title>canvas prose is skipped</title>
+<style>body { background: url(//styles.example/canvas.png) }</style>
+<script src="https://www.googletagmanager.com/gtm.js?id=GTM-1"></script>
+<script>var c = document.createElement('canvas'); c.toDataURL();</script>
+<script type="application/ld+json">{"name": "toDataURL"}</script>
+<!-- <script>navigator.plugins</script> -->
+</head><body>
+<p>We never call navigator.plugins here.</p>
+<iframe src="https://ads.example/frame"></iframe>
+<img src="https://pixel.example/p.gif" width="1" height="1">
+<img style="display: none" src="https://hidden.example/p.gif">
+<img src="/logo.png" width="120" height="40">
+<img src="data:image/gif;base64,R0lGOD">
+<link rel="preconnect" href="https://cdn.example">
+</body></html>"""
+
+
+def tokenize(page, chunk_size=None):
+    regions, resources, pixels = [], [], []
+
+    def on_text(text, fresh):
+        if fresh:
+            regions.append('')
+        regions[-1] += text
+
+    tokenizer = server.PageTokenizer(on_text, resources.append, pixels.append)
+    chunk_size = chunk_size or len(page)
+    for start in range(0, len(page), chunk_size):
+        tokenizer.feed(page[start:start + chunk_size])
+    tokenizer.close()
+    return regions, resources, pixels
+
+
+def test_only_scripts_and_tag_urls_are_passed_on():
+    regions, _, _ = tokenize(PAGE)
+    assert regions == [
+        "https://www.googletagmanager.com/gtm.js?id=GTM-1",
+        "var c = document.createElement('canvas'); c.toDataURL();",
+        "https://ads.example/frame",
+        "https://pixel.example/p.gif",
+        "https://hidden.example/p.gif",
+        "/logo.png",
+        "https://cdn.example",
+    ]
+
+
+def test_resources_and_pixels():
+    _, resources, pixels = tokenize(PAGE)
+    assert resources == ["https://www.googletagmanager.com/gtm.js?id=GTM-1", "https://ads.example/frame"]
+    assert pixels == ["https://pixel.example/p.gif", "https://hidden.example/p.gif"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_chunking_does_not_change_the_regions(chunk_size):
+    assert tokenize(PAGE, chunk_size) == tokenize(PAGE)
+
+
+def test_scanner_matches_only_script_regions():
+    scanner = server.PageScanner(server.PatternMatcher(["canvas", "todataurl", "navigator.plugins"]))
+    for start in range(0, len(PAGE), 5):
+        scanner.feed(PAGE[start:start + 5].encode())
+    scanner.close()
+    assert scanner.matches == {"canvas": 1, "todataurl": 1}
+    assert scanner.pixels == ["https://pixel.example/p.gif", "https://hidden.example/p.gif"]
@@ -0,0 +1,44 @@
+import random
+
+import server
+
+
+def scan(matcher, chunks):
+    counts, tail = {}, ''
+    for chunk in chunks:
+        tail = matcher.scan(chunk, tail, counts)
+    return {matcher.patterns[index]: count for index, count in counts.items()}
+
+
+def test_overlapping_keywords_are_all_reported():
+    matcher = server.PatternMatcher(['canvas', 'webgl', 'webrtc'])
+    assert scan(matcher, ['webrtcanvas']) == {'webrtc': 1, 'canvas': 1}
+
+
+def test_patterns_that_prefix_a_longer_hit_are_reported():
+    matcher = server.PatternMatcher(['audio', 'audiocont', 'context'])
+    assert scan(matcher, ['new audiocontext()']) == {'audio': 1, 'audiocont': 1, 'context': 1}
+
+
+def test_hits_split_across_chunks_are_counted_once():
+    matcher = server.PatternMatcher(['canvas', 'todataurl', 'getimagedata', 'webgl', 'audiocont', 'webrtc'])
+    rng = random.Random(0)
+    words = ['canvas', 'todataurl', 'webgl', 'getimagedata', 'audiocont', 'webrtcanvas', 'x', ' ']
+    text = ''.join(rng.choice(words) for _ in range(2000))
+    expected = {
+        pattern: sum(text.startswith(pattern, offset) for offset in range(len(text)))
+        for pattern in matcher.patterns
+    }
+    assert scan(matcher, [text]) == expected
+    for _ in range(20):
+        chunks, offset = [], 0
+        while offset < len(text):
+            size = rng.randint(1, 20)
+            chunks.append(text[offset:offset + size])
+            offset += size
+        assert scan(matcher, chunks) == expected
+
+
+def test_fingerprinting_detects_overlapping_techniques():
+    findings = server.privacy_analyzer._analyze_fingerprinting('<script>webrtcanvas</script>')
+    assert {finding.check.technique for finding in findings if finding.detected} == {'WebRTC IP Leakage', 'Canvas Fingerprinting'}
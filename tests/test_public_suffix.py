@@ -0,0 +1,45 @@
+import pytest
+
+import server
+
+RULES = [
+    "// comment",
+    "uk",
+    "co.uk",
+    "com",
+    "*.ck",
+    "!www.ck",
+    "*.kawasaki.jp",
+    "!city.kawasaki.jp",
+    "公司.cn",
+]
+
+
+@pytest.fixture
+def suffixes():
+    return server.PublicSuffixList(RULES)
+
+
+@pytest.mark.parametrize("host, expected", [
+    ("news.bbc.co.uk", "bbc.co.uk"),
+    ("bbc.co.uk", "bbc.co.uk"),
+    ("WWW.Example.COM", "example.com"),
+    ("a.b.example.ck", "b.example.ck"),      # wildcard: example.ck is itself a suffix
+    ("www.ck", "www.ck"),                    # exception to the wildcard
+    ("x.www.ck", "www.ck"),
+    ("shop.city.kawasaki.jp", "city.kawasaki.jp"),
+    ("a.b.other.kawasaki.jp", "b.other.kawasaki.jp"),
+    ("foo.example.unlisted", "example.unlisted"),  # implicit "*" rule
+    ("shop.example.xn--55qx5d.cn", "example.xn--55qx5d.cn"),  # IDN rule matched in punycode
+])
+def test_registrable_domain(suffixes, host, expected):
+    assert suffixes.registrable_domain(host) == expected
+
+
+@pytest.mark.parametrize("host", ["co.uk", "localhost", "192.168.0.1"])
+def test_suffixes_single_labels_and_addresses_are_returned_as_is(suffixes, host):
+    assert suffixes.registrable_domain(host) == host
+
+
+def test_bundled_list_knows_bbc():
+    assert server.privacy_analyzer.public_suffixes.registrable_domain("news.bbc.co.uk") == "bbc.co.uk"
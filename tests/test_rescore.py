@@ -0,0 +1,100 @@
+import asyncio
+
+import numpy as np
+
+import server
+
+
+def score(domains, cookies, fingerprinting, third_parties, platform_trackers, **thresholds):
+    return list(server.score_threat_levels(
+        np.array(domains),
+        np.array(cookies),
+        np.array(fingerprinting),
+        np.array(third_parties),
+        np.array(platform_trackers, dtype=bool),
+        server.ThreatThresholds(**thresholds)
+    ))
+
+
+def test_levels_follow_tracking_totals():
+    levels = score(
+        ["small.example", "medium.example", "large.example"],
+        [4, 5, 10],
+        [1, 3, 3],
+        [3, 4, 5],
+        [True, True, True],
+    )
+    assert levels == ["LOW", "MEDIUM", "HIGH"]
+
+
+def test_known_platform_domains_are_high():
+    assert score(["m.facebook.com"], [4], [0], [3], [False]) == ["HIGH"]
+
+
+def test_personal_sites_stay_low():
+    # Few cookies and third parties, not a platform, no platform trackers: a personal site
+    assert score(["blog.example"], [2], [1], [2], [False], medium=4) == ["LOW"]
+    assert score(["blog.example"], [4], [0], [1], [True], medium=4) == ["MEDIUM"]
+    assert score(["blog.example"], [2], [7], [2], [False]) == ["MEDIUM"]
+
+
+def test_custom_thresholds():
+    assert score(["shop.example"], [6], [2], [4], [True], high=12) == ["HIGH"]
+
+
+def test_matches_live_scorer():
+    analyzer = server.privacy_analyzer
+    cookies = [server.CookieFinding(f"c{i}", "t", "p", None, "shop.example", "Session", False, None, False, False, None)
+               for i in range(5)]
+    level, _, _ = analyzer._calculate_threat_level(cookies, [], [], "shop.example")
+    assert score(["shop.example"], [5], [0], [0], [False]) == [level]
+
+
+def stored_result(domain, cookies, level, description):
+    return {"_id": domain, "domain": domain, "cookieCount": cookies, "fingerprinting": [], "thirdParties": [],
+            "threatLevel": level, "threatDescription": description, "analysisTimestamp": "2026-01-01T00:00:00"}
+
+
+def rescore(**request):
+    return asyncio.run(server.rescore_stored_analyses(server.RescoreRequest(**request)))
+
+
+def test_rescore_rewrites_descriptions_with_levels(mongo):
+    async def seed():
+        await mongo.analysis_results.insert_many([
+            stored_result("shop.example", 12, "MEDIUM", "Moderate tracking with 12 mechanisms detected"),
+            stored_result("tiny.example", 1, "LOW", "Personal/minimal tracking website with 1 mechanisms"),
+        ])
+        await mongo.analysis_logs.insert_one({
+            "domain": "www.facebook.com", "threat_level": "LOW", "is_high_threat_domain": False,
+            "cookies_found": 6, "fingerprinting_methods": 0, "third_parties": 0, "third_party_domains": []
+        })
+
+    asyncio.run(seed())
+    result = rescore(thresholds={"high": 12})
+    assert result["collections"]["analysis_results"]["changed"] == 1
+
+    async def stored():
+        return (await mongo.analysis_results.find_one({"_id": "shop.example"}),
+                await mongo.analysis_logs.find_one({"domain": "www.facebook.com"}))
+
+    shop, facebook = asyncio.run(stored())
+    assert (shop["threatLevel"], shop["threatDescription"]) == ("HIGH", "Surveillance-heavy domain with 12 tracking mechanisms")
+    assert (facebook["threat_level"], facebook["is_high_threat_domain"]) == ("HIGH", True)
+
+
+def test_custom_thresholds_leave_live_scoring_and_cache_alone(mongo, monkeypatch):
+    cache = server.TTLCache(10, 60)
+    cache.set("key", {"threatLevel": "LOW"})
+    monkeypatch.setattr(server, 'analysis_cache', cache)
+    monkeypatch.setattr(server.privacy_analyzer, 'thresholds', server.ThreatThresholds())
+
+    result = rescore(thresholds={"high": 12})
+    assert not result["appliedLive"]
+    assert server.privacy_analyzer.thresholds.high == 16
+    assert len(cache) == 1
+
+    result = rescore(thresholds={"high": 12}, applyLive=True)
+    assert result["appliedLive"]
+    assert server.privacy_analyzer.thresholds.high == 12
+    assert len(cache) == 0
@@ -0,0 +1,34 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import server
+
+
+def timed_app():
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        with server.timed_stage('crawl'):
+            pass
+        return {"ok": True}
+
+    app.add_middleware(server.ServerTimingMiddleware)
+    return app
+
+
+def test_stage_durations_are_reported():
+    response = TestClient(timed_app()).get("/work")
+    assert response.json() == {"ok": True}
+    stages = [entry.split(';')[0] for entry in response.headers['server-timing'].split(', ')]
+    assert stages == ['crawl', 'total']
+
+
+def test_timings_do_not_leak_outside_the_request():
+    TestClient(timed_app()).get("/work")
+    assert server._request_timings.get() is None
+
+
+def test_middleware_is_not_registered_when_disabled():
+    assert not server.SERVER_TIMING_ENABLED
+    assert server.ServerTimingMiddleware not in [middleware.cls for middleware in server.app.user_middleware]
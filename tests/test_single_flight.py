@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+def test_concurrent_callers_share_one_run():
+    async def scenario():
+        flight = server.SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        results = await asyncio.gather(*(flight.run("key", work) for _ in range(5)))
+        return results, calls, len(flight)
+
+    results, calls, pending = asyncio.run(scenario())
+    assert results == ["done"] * 5
+    assert len(calls) == 1
+    assert pending == 0
+
+
+def test_cancelled_waiter_does_not_cancel_shared_task():
+    async def scenario():
+        flight = server.SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.run("key", work))
+        second = asyncio.create_task(flight.run("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return first, await second
+
+    first, result = asyncio.run(scenario())
+    assert first.cancelled()
+    assert result == "done"
+
+
+def test_exception_reaches_every_caller_and_key_is_released():
+    async def scenario():
+        flight = server.SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.run("key", fail), flight.run("key", fail), return_exceptions=True)
+        return results, len(flight)
+
+    results, pending = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert pending == 0
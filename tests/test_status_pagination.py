@@ -0,0 +1,45 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+@pytest.fixture
+def client(mongo):
+    started = datetime(2026, 1, 1)
+    # Pairs of checks share a timestamp so pages have to break ties on id
+    checks = [{"id": f"check-{index:02d}", "client_name": "probe" if index % 3 else "other",
+               "timestamp": started + timedelta(minutes=index // 2)} for index in range(25)]
+    asyncio.run(mongo.status_checks.insert_many(checks))
+    return TestClient(server.app)
+
+
+def walk(client, **params):
+    pages, cursor = [], None
+    while True:
+        body = client.get("/api/status", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        pages.append(body["items"])
+        cursor = body.get("nextCursor")
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_every_check_newest_first(client):
+    pages = walk(client, limit=4)
+    ids = [item["id"] for page in pages for item in page]
+    assert [len(page) for page in pages] == [4] * 6 + [1]
+    assert ids == [f"check-{index:02d}" for index in reversed(range(25))]
+
+
+def test_filter_and_field_projection(client):
+    pages = walk(client, limit=5, client_name="other", fields="id")
+    items = [item for page in pages for item in page]
+    assert items == [{"id": f"check-{index:02d}"} for index in reversed(range(0, 25, 3))]
+
+
+def test_bad_requests_are_rejected(client):
+    assert client.get("/api/status", params={"fields": "id,secret"}).status_code == 400
+    assert client.get("/api/status", params={"cursor": "not-a-cursor"}).status_code == 400
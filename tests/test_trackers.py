@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+import server
+
+LEGACY_GA = """<script>
+  var ga = document.createElement('script'); ga.type = 'text/javascript'; ga.async = true;
+  ga.src = ('https:' == document.location.protocol ? 'https://ssl' : 'http://www') + '.google-analytics.com/ga.js';
+</script>"""
+MIXPANEL = "<script>mixpanel.init('token', {api_host:'api.mixpanel.com', debug: false});</script>"
+AMPLITUDE = '<script>var s = document.createElement("script"); s.src = "cdn.amplitude.com/libs/amplitude-8.js";</script>'
+
+
+def scan_hosts(text, chunk_size=None, html=True):
+    scanner = server.PageScanner(server.privacy_analyzer.matcher, html=html)
+    body = text.encode()
+    chunk_size = chunk_size or len(body) or 1
+    for offset in range(0, len(body), chunk_size):
+        scanner.feed(body[offset:offset + chunk_size])
+    scanner.close()
+    return scanner.hosts
+
+
+@pytest.mark.parametrize("snippet, domain", [
+    (LEGACY_GA, "google-analytics.com"),
+    (MIXPANEL, "mixpanel.com"),
+    (AMPLITUDE, "amplitude.com"),
+])
+def test_embeds_without_a_scheme_are_detected(snippet, domain):
+    parties = server.privacy_analyzer._analyze_third_parties(snippet)
+    assert domain in {party.domain for party in parties}
+
+
+def test_member_chains_are_not_hosts():
+    hosts = scan_hosts("<script>document.body.appendChild(ga); window.location.href = x.y;</script>")
+    assert hosts == {}
+
+
+def test_host_tokens_are_whole_words():
+    hosts = scan_hosts("<script>a='xgoogle-analytics.com'; b='//www.google-analytics.com/x'</script>", html=True)
+    assert hosts == {"xgoogle-analytics.com": 1, "www.google-analytics.com": 1}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 300])
+def test_host_tokens_split_across_chunks_are_counted_once(chunk_size):
+    text = "<script>" + ("a.b.c + 'https://cdn.amplitude.com/x.js' + api.mixpanel.com;" + " " * 200) * 4 + "</script>"
+    assert scan_hosts(text, chunk_size) == scan_hosts(text) == {"cdn.amplitude.com": 4, "api.mixpanel.com": 4}
+
+
+def test_parse_domain_list_formats():
+    lines = [
+        "! Type: advertising surveillance",
+        "||ads.example.com^$third-party",
+        "||example.net/path^",
+        "0.0.0.0 tracker.example.org",
+        "0.0.0.0 0.0.0.0",
+        "# comment",
+        "Bare.Example.IO.",
+    ]
+    assert [domain for domain, _ in server.parse_domain_list(lines)] == [
+        "ads.example.com", "tracker.example.org", "bare.example.io"
+    ]
+    assert dict(server.parse_domain_list(lines))["ads.example.com"][0] == "advertising surveillance"
+
+
+def test_lookup_finds_most_specific_listed_domain():
+    database = server.TrackerDatabase([
+        ("example.com", ("tracking", "data collection")),
+        ("ads.example.com", ("advertising surveillance", "attention economy")),
+    ])
+    assert database.lookup("a.b.example.com") == "example.com"
+    assert database.lookup("x.ads.example.com") == "ads.example.com"
+    assert database.lookup("example.org") is None
+    assert database.lookup("notexample.com") is None
+
+
+def test_load_reads_lists_and_reputation(tmp_path):
+    tracker_dir = tmp_path / "trackers"
+    tracker_dir.mkdir()
+    (tracker_dir / "a.txt").write_text("||one.example^\n||shared.example^\n")
+    (tracker_dir / "b.json").write_text(json.dumps({"categories": {"Analytics": [
+        {"Shared": {"https://shared.example/": ["shared.example"], "performance": "true"}}
+    ]}}))
+    reputation = tmp_path / "reputation.txt"
+    reputation.write_text("# flagged\nplatform.example\n")
+
+    database = server.TrackerDatabase.load(tracker_dir, reputation)
+    assert set(database.trackers) == {"one.example", "shared.example"}
+    # Later files override earlier ones
+    assert database.trackers["shared.example"][0] == "surveillance capitalism"
+    assert database.reputation.lookup("m.platform.example") == "platform.example"
+    assert len(database.sources) == 3
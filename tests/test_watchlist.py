@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import server
+
+
+def analysis(level, cookies=(), third_parties=()):
+    return SimpleNamespace(
+        domain="shop.example",
+        threatLevel=level,
+        cookies=[SimpleNamespace(name=name) for name in cookies],
+        thirdParties=[SimpleNamespace(domain=domain) for domain in third_parties],
+        fingerprinting=[]
+    )
+
+
+@pytest.fixture
+def scans(mongo, monkeypatch):
+    """Analyses returned by successive rescans, in order"""
+    results = []
+
+    async def analyze_website(url, options, log=True):
+        return results.pop(0)
+
+    monkeypatch.setattr(server.privacy_analyzer, 'analyze_website', analyze_website)
+    return results
+
+
+def scheduler():
+    return server.WatchlistScheduler('watchlist', 4, 2, 0, 30, 0.1)
+
+
+def test_first_run_is_spread_over_the_interval(mongo):
+    async def scenario():
+        before = datetime.utcnow()
+        entry = await scheduler().add(server.WatchlistEntryCreate(url="https://Shop.example", intervalSeconds=3600))
+        return before, entry
+
+    before, entry = asyncio.run(scenario())
+    assert entry["_id"] == "https://shop.example/"
+    assert before <= entry["nextRunAt"] <= before + timedelta(seconds=3601)
+
+
+def test_only_changes_are_logged(mongo, scans):
+    async def scenario():
+        watchlist = scheduler()
+        watchlist._semaphore = asyncio.Semaphore(watchlist.concurrency)
+        await watchlist.add(server.WatchlistEntryCreate(url="https://shop.example", intervalSeconds=60))
+        ran = []
+        for _ in range(3):
+            await mongo.watchlist.update_many({}, {"$set": {"nextRunAt": datetime.utcnow() - timedelta(seconds=1)}})
+            ran.append(await watchlist.run_due())
+        return ran, await mongo.analysis_logs.find().sort("timestamp", 1).to_list(None)
+
+    scans.extend([analysis("LOW", ["sid"]), analysis("LOW", ["sid"]), analysis("MEDIUM", ["sid", "_ga"], ["google-analytics.com"])])
+    ran, logs = asyncio.run(scenario())
+    assert ran == [1, 1, 1]
+    assert len(logs) == 2
+    assert logs[0]["previous_threat_level"] is None
+    assert (logs[1]["record_type"], logs[1]["threat_level"], logs[1]["previous_threat_level"]) == ("rescan_diff", "MEDIUM", "LOW")
+    assert logs[1]["new_cookies"] == ["_ga"] and logs[1]["new_third_parties"] == ["google-analytics.com"]
+
+
+def test_a_due_entry_is_claimed_by_one_scheduler(mongo, scans):
+    async def scenario():
+        first, second = scheduler(), scheduler()
+        for watchlist in (first, second):
+            watchlist._semaphore = asyncio.Semaphore(watchlist.concurrency)
+        await first.add(server.WatchlistEntryCreate(url="https://shop.example", intervalSeconds=60))
+        await mongo.watchlist.update_many({}, {"$set": {"nextRunAt": datetime.utcnow() - timedelta(seconds=1)}})
+        return await asyncio.gather(first.run_due(), second.run_due())
+
+    scans.append(analysis("LOW"))
+    assert sorted(asyncio.run(scenario())) == [0, 1]
+
+
+def test_snapshot_diff():
+    previous = {"threat_level": "LOW", "cookies": ["a"], "third_parties": [], "fingerprinting": []}
+    assert server.WatchlistScheduler._diff(previous, dict(previous)) is None
+    diff = server.WatchlistScheduler._diff(previous, {**previous, "cookies": ["b"]})
+    assert (diff["new_cookies"], diff["removed_cookies"]) == (["b"], ["a"])
@@ -0,0 +1,88 @@
+import asyncio
+
+from pymongo import UpdateOne
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+import server
+
+
+class FlakyCollection:
+    """Fails the first calls with the given errors, then records what it is asked to write"""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = []
+
+    async def _call(self, items):
+        self.calls.append(list(items))
+        if self.errors:
+            raise self.errors.pop(0)
+
+    async def insert_many(self, documents, ordered=True):
+        await self._call(documents)
+
+    async def bulk_write(self, operations, ordered=True):
+        await self._call(operations)
+
+
+def dropped(collection):
+    return server.WRITES_DROPPED._values.get((collection,), 0)
+
+
+def run_flush(collections, batch, retries=2):
+    buffer = server.MongoWriteBuffer(collections, 10, 0.01, 100, retries=retries, retry_delay=0.001)
+    asyncio.run(buffer._flush(batch))
+
+
+def test_batches_are_flushed_per_collection(mongo):
+    async def scenario():
+        buffer = server.MongoWriteBuffer(mongo, 3, 0.05, 100)
+        buffer.start()
+        for index in range(7):
+            await buffer.enqueue('analysis_logs', {"_id": index})
+        await buffer.enqueue_update('rollups', {"_id": "day"}, {"$inc": {"count": 1}})
+        await buffer.enqueue_update('rollups', {"_id": "day"}, {"$inc": {"count": 2}})
+        await buffer.stop()
+        return await mongo.analysis_logs.count_documents({}), await mongo.rollups.find_one({"_id": "day"})
+
+    count, rollup = asyncio.run(scenario())
+    assert count == 7
+    assert rollup["count"] == 3
+
+
+def test_writes_go_directly_until_started(mongo):
+    async def scenario():
+        buffer = server.MongoWriteBuffer(mongo, 3, 0.05, 100)
+        await buffer.enqueue('analysis_logs', {"_id": "direct"})
+        return await mongo.analysis_logs.find_one({"_id": "direct"})
+
+    assert asyncio.run(scenario()) is not None
+
+
+def test_transient_failures_are_retried():
+    logs = FlakyCollection([AutoReconnect("primary stepped down")])
+    run_flush({'logs': logs}, [('logs', {"_id": 1}), ('logs', {"_id": 2})])
+    assert logs.calls == [[{"_id": 1}, {"_id": 2}]] * 2
+
+
+def test_only_failed_upserts_are_retried():
+    operations = [UpdateOne({"_id": day}, {"$inc": {"count": 1}}, upsert=True) for day in ("a", "b", "c")]
+    partial = BulkWriteError({"writeErrors": [{"index": 1, "code": 91, "errmsg": "shutting down"}]})
+    rollups = FlakyCollection([partial])
+    run_flush({'rollups': rollups}, [('rollups', operation) for operation in operations])
+    assert rollups.calls == [operations, [operations[1]]]
+
+
+def test_duplicate_keys_count_as_written():
+    duplicate = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "duplicate key"}]})
+    logs = FlakyCollection([duplicate])
+    run_flush({'logs': logs}, [('logs', {"_id": 1})])
+    assert len(logs.calls) == 1
+
+
+def test_writes_that_keep_failing_are_dropped_and_counted():
+    before = dropped('dead')
+    logs = FlakyCollection([AutoReconnect("down")] * 3)
+    run_flush({'dead': logs}, [('dead', {"_id": 1}), ('dead', {"_id": 2})], retries=2)
+    assert len(logs.calls) == 3
+    assert dropped('dead') - before == 2